@@ -185,30 +185,6 @@ def install_dependencies() -> int:
     return result
 
 
-def setup_nltk_data() -> None:
-    """
-    Download required NLTK data.
-    """
-    print("Setting up NLTK data...")
-    try:
-        cmd = ["uv", "run", "python", "-c", """
-import nltk
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-    print('NLTK data already available')
-except LookupError:
-    print('Downloading NLTK data...')
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    print('NLTK data download complete')
-"""]
-        subprocess.call(cmd)
-        print("✅ NLTK data setup complete")
-    except Exception as e:
-        print(f"⚠️  Error setting up NLTK data: {e}")
-
-
 def main():
     """Main function to handle command line arguments and run tests."""
     parser = argparse.ArgumentParser(description="Test runner for duplicate logic detection")
@@ -246,7 +222,6 @@ def main():
     
     if args.command == 'install':
         exit_code = install_dependencies()
-        setup_nltk_data()
         sys.exit(exit_code)
     
     elif args.command == 'unit':
@@ -275,7 +250,6 @@ def main():
         # Install dependencies
         print("\n1. Installing dependencies...")
         install_exit_code = install_dependencies()
-        setup_nltk_data()
         
         if install_exit_code != 0:
             print("❌ Dependency installation failed")
@@ -35,12 +35,7 @@ def main():
     command = sys.argv[1]
     
     if command == "install":
-        exit_code = run_cmd(["uv", "sync", "--all-extras"], "Installing dependencies")
-        if exit_code == 0:
-            run_cmd(["uv", "run", "python", "-c", 
-                    "import nltk; nltk.download('punkt', quiet=True); nltk.download('stopwords', quiet=True)"],
-                   "Setting up NLTK data")
-        sys.exit(exit_code)
+        sys.exit(run_cmd(["uv", "sync", "--all-extras"], "Installing dependencies"))
         
     elif command == "test":
         sys.exit(run_cmd(["uv", "run", "pytest", "tests/", "-v"], "Running unit tests"))
@@ -6,19 +6,44 @@ A modular package for detecting duplicate logic in Python code.
 
 __version__ = "1.0.0"
 
-# Main exports for easy importing
-from .detector import DuplicateLogicDetector
-from .models import CodeFunction, DuplicateMatch
-from .similarity import SimilarityAnalyzer
-from .extractor import PythonFunctionExtractor
-from .reporters import MultiFormatReporter
-from .thresholds import ThresholdConfig
+import importlib
+from typing import Any
+
+# ``main`` shares its name with its submodule, so it is imported eagerly: a
+# lazy lookup would be shadowed by the submodule once that is imported.
+# main.py defers its own heavy imports, so this stays cheap.
 from .main import main
 
+# Main exports for easy importing. They are loaded on first access so that
+# importing the package (e.g. to run ``main --help``) stays cheap.
+_EXPORTS = {
+    "DuplicateLogicDetector": ".detector",
+    "CodeFunction": ".models",
+    "DuplicateMatch": ".models",
+    "FunctionTable": ".models",
+    "MatchSet": ".models",
+    "SimilarityAnalyzer": ".similarity",
+    "PythonFunctionExtractor": ".extractor",
+    "MultiFormatReporter": ".reporters",
+    "ThresholdConfig": ".thresholds",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
     "DuplicateLogicDetector",
     "CodeFunction", 
     "DuplicateMatch",
+    "FunctionTable",
+    "MatchSet",
     "SimilarityAnalyzer",
     "PythonFunctionExtractor", 
     "MultiFormatReporter",
@@ -0,0 +1,141 @@
+"""
+Persistent cache module for the duplicate logic detector.
+
+This module stores derived data (such as token sets) on disk between runs so
+that unchanged code does not have to be processed again. Entries are keyed by
+a hash of the content they were derived from, so edits invalidate themselves.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Union
+
+from rich.console import Console
+
+
+class AnalysisCache:
+    """
+    On-disk key/value cache split into namespaces.
+
+    Each namespace is a single pickle file in the cache directory, loaded on
+    first use and rewritten by :meth:`save` only if it changed. Entries that
+    were not read or written during the run are dropped when saving, so the
+    cache tracks the current codebase instead of growing without bound.
+
+    The cache directory must be trusted: its files are unpickled on load.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], console: Optional[Console] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache files (created on save)
+            console: Rich console for output
+        """
+        self.cache_dir = Path(cache_dir)
+        self.console = console or Console()
+        self._entries: Dict[str, Dict[bytes, Any]] = {}
+        self._used: Dict[str, Set[bytes]] = {}
+        self._dirty: Set[str] = set()
+
+    @staticmethod
+    def content_key(content: str) -> bytes:
+        """
+        Get the cache key for a piece of source text.
+
+        Args:
+            content: Text the cached value is derived from
+
+        Returns:
+            16-byte BLAKE2b digest of the UTF-8 encoded text
+        """
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, namespace: str, key: bytes) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            namespace: Name of the namespace (one file per namespace)
+            key: Entry key, usually from :meth:`content_key`
+
+        Returns:
+            The cached value, or None if it is not cached
+        """
+        value = self._load(namespace).get(key)
+        if value is not None:
+            self._used[namespace].add(key)
+        return value
+
+    def put(self, namespace: str, key: bytes, value: Any) -> None:
+        """
+        Store a value in the cache.
+
+        Args:
+            namespace: Name of the namespace (one file per namespace)
+            key: Entry key, usually from :meth:`content_key`
+            value: Picklable value to store
+        """
+        self._load(namespace)[key] = value
+        self._used[namespace].add(key)
+        self._dirty.add(namespace)
+
+    def save(self) -> None:
+        """Write every changed namespace back to disk."""
+        for namespace in sorted(self._dirty):
+            used = self._used[namespace]
+            entries = {
+                key: value
+                for key, value in self._entries[namespace].items()
+                if key in used
+            }
+            try:
+                self._write(self._path(namespace), entries)
+            except OSError as e:
+                self.console.print(
+                    f"[yellow]Could not write cache {namespace}: {e}[/yellow]"
+                )
+        self._dirty.clear()
+
+    def _path(self, namespace: str) -> Path:
+        """Get the file backing a namespace."""
+        return self.cache_dir / f"{namespace}.pkl"
+
+    def _load(self, namespace: str) -> Dict[bytes, Any]:
+        """Get the entries of a namespace, reading its file on first use."""
+        entries = self._entries.get(namespace)
+        if entries is None:
+            entries = {}
+            path = self._path(namespace)
+            if path.is_file():
+                try:
+                    with open(path, "rb") as f:
+                        loaded = pickle.load(f)
+                    if isinstance(loaded, dict):
+                        entries = loaded
+                except Exception as e:
+                    # A corrupt or incompatible cache is simply rebuilt
+                    self.console.print(
+                        f"[yellow]Ignoring unreadable cache {path}: {e}[/yellow]"
+                    )
+            self._entries[namespace] = entries
+            self._used[namespace] = set()
+        return entries
+
+    def _write(self, path: Path, entries: Dict[bytes, Any]) -> None:
+        """Atomically replace ``path`` with the pickled entries."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=path.parent, prefix=path.name, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
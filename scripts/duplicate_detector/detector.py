@@ -6,18 +6,37 @@ all the other modules to perform duplicate logic detection on code changes.
 """
 
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from .cache import AnalysisCache
 from .extractor import PythonFunctionExtractor
-from .models import CodeFunction, DuplicateMatch
-from .similarity import SimilarityAnalyzer
+from .models import CodeFunction, DuplicateMatch, FunctionTable
+from .similarity import SimilarityAnalyzer, _process_count
 from .thresholds import ThresholdConfig
 
 
+def _extract_file_functions(
+    file_path: Path, with_key: bool
+) -> Tuple[Optional[bytes], List[CodeFunction]]:
+    """
+    Extract the functions of one file in a worker process.
+
+    Args:
+        file_path: Path to the Python file to analyze
+        with_key: Whether to return the cache key of the parsed text
+
+    Returns:
+        Cache key of the parsed text (or None) and all functions found in the file
+    """
+    return PythonFunctionExtractor().extract_keyed_from_file(file_path, with_key)
+
+
 class DuplicateLogicDetector:
     """
     Main class for detecting duplicate logic in code changes.
@@ -26,6 +45,8 @@ class DuplicateLogicDetector:
     and duplicate detection process for pull request changes.
     """
 
+    INDEX_TYPES = ("exhaustive", "minhash_lsh")
+
     def __init__(
         self,
         repository_path: str,
@@ -33,6 +54,10 @@ class DuplicateLogicDetector:
         min_function_lines: int = 5,
         threshold_config: Optional[ThresholdConfig] = None,
         console: Optional[Console] = None,
+        cache_dir: Optional[str] = None,
+        n_jobs: Optional[int] = None,
+        min_shared_ngrams: Optional[int] = None,
+        index: str = "exhaustive",
     ):
         """
         Initialize the duplicate logic detector.
@@ -43,16 +68,40 @@ class DuplicateLogicDetector:
             min_function_lines: Minimum lines for a function to be analyzed
             threshold_config: Configuration for similarity thresholds
             console: Rich console for output
+            cache_dir: Directory for the persistent analysis cache (disabled if None)
+            n_jobs: Parallelism for indexing and similarity scoring (-1 for
+                all cores, None for each step's default)
+            min_shared_ngrams: If set, only score pairs sharing at least this
+                many token 3-grams instead of every pair (faster, approximate)
+            index: How pairs to score are chosen: "exhaustive" scores every
+                pair, "minhash_lsh" only pairs found by MinHash LSH over token
+                3-grams (sublinear, approximate)
+
+        Raises:
+            ValueError: If the index type is not supported
         """
+        if index not in self.INDEX_TYPES:
+            raise ValueError(
+                f"Unknown index '{index}'. Available: {', '.join(self.INDEX_TYPES)}"
+            )
+
         self.repo_path = Path(repository_path)
         self.console = console or Console()
         self.min_function_lines = min_function_lines
+        self.n_jobs = n_jobs
+        self.min_shared_ngrams = min_shared_ngrams
+        self.index = index
         
         # Initialize the components
-        self.extractor = PythonFunctionExtractor(self.console)
-        self.similarity_analyzer = SimilarityAnalyzer(similarity_method)
+        self.cache = AnalysisCache(cache_dir, self.console) if cache_dir else None
+        self.extractor = PythonFunctionExtractor(self.console, cache=self.cache)
+        self.similarity_analyzer = SimilarityAnalyzer(
+            similarity_method, cache=self.cache
+        )
         self.threshold_config = threshold_config or ThresholdConfig(console=self.console)
         self.existing_functions: List[CodeFunction] = []
+        # Filtered functions of each indexed file, reused for changed files
+        self._indexed_files: Dict[Path, List[CodeFunction]] = {}
         
         # Log the configuration
         self.console.print(f"[blue]Initialized detector with {similarity_method} similarity method[/blue]")
@@ -62,6 +111,7 @@ class DuplicateLogicDetector:
         changed_files: List[str],
         base_sha: str,
         head_sha: str,
+        max_matches: Optional[int] = None,
     ) -> List[DuplicateMatch]:
         """
         Analyze changes in a pull request for duplicate logic.
@@ -70,16 +120,21 @@ class DuplicateLogicDetector:
             changed_files: List of file paths that changed in the PR
             base_sha: Base commit SHA for comparison
             head_sha: Head commit SHA for comparison
+            max_matches: If set, keep only this many of the highest-scoring
+                matches instead of materializing every match
             
         Returns:
             List of duplicate matches sorted by similarity score (highest first)
         """
         matches = []
 
+        # Off a terminal (e.g. CI logs) the spinner is never animated, so
+        # skip its refresh thread and the final snapshot it would print
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             console=self.console,
+            disable=not self.console.is_terminal,
         ) as progress:
             # Step 1: Index existing codebase
             task1 = progress.add_task("Indexing existing codebase...", total=None)
@@ -96,21 +151,27 @@ class DuplicateLogicDetector:
                 "Analyzing changed files...", total=len(python_files)
             )
 
+            new_functions: List[CodeFunction] = []
             for file_path in python_files:
                 if not Path(file_path).exists():
                     progress.advance(task2)
                     continue
 
                 # Get functions that were added or modified
-                new_functions = self._get_changed_functions(file_path, base_sha, head_sha)
-
-                # Find similar functions for each new function
-                for new_func in new_functions:
-                    function_matches = self._find_similar_functions(new_func)
-                    matches.extend(function_matches)
+                new_functions.extend(
+                    self._get_changed_functions(file_path, base_sha, head_sha)
+                )
 
                 progress.advance(task2)
 
+            # Step 3: Score all new functions against the index in one batch
+            if max_matches is not None:
+                matches = self.similarity_analyzer.top_k_matches(
+                    self._iter_candidate_pairs(new_functions), max_matches
+                )
+            else:
+                matches = self._find_matches(new_functions)
+
         # Sort by similarity score (highest first)
         matches.sort(key=lambda m: m.similarity_score, reverse=True)
 
@@ -120,28 +181,99 @@ class DuplicateLogicDetector:
     def _index_existing_functions(self) -> None:
         """Index all functions in the existing codebase."""
         self.existing_functions = []
+        self._indexed_files = {}
         
-        # Find all Python files in the repository
-        python_files = list(self.repo_path.glob("**/*.py"))
-        
-        for file_path in python_files:
-            if file_path.is_file():
-                functions = self.extractor.extract_from_file(file_path)
-                
-                # Filter functions based on criteria
-                filtered_functions = self.extractor.filter_functions(
-                    functions,
-                    min_lines=self.min_function_lines,
-                    exclude_test_files=True,
-                    exclude_private=False,
+        # Find all Python files in the repository, rejecting test files
+        # before parsing them at all
+        python_files = [
+            file_path
+            for file_path in self._list_python_files()
+            if not self.extractor._is_test_file(str(file_path)) and file_path.is_file()
+        ]
+
+        # Files unchanged since a cached run are not parsed at all
+        per_file: List[Optional[List[CodeFunction]]] = [
+            self.extractor.get_cached_functions(path) for path in python_files
+        ]
+        misses = [i for i, functions in enumerate(per_file) if functions is None]
+
+        # Parsing is pure Python, so spread the rest over processes when asked to.
+        # Workers hash the text they parse, so results are cached under the
+        # content they were derived from without reading the file again.
+        processes = min(_process_count(self.n_jobs), len(misses))
+        if processes > 1:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                parsed = executor.map(
+                    _extract_file_functions,
+                    [python_files[i] for i in misses],
+                    repeat(self.cache is not None),
+                    chunksize=16,
                 )
-                
-                self.existing_functions.extend(filtered_functions)
+                for i, (key, extracted) in zip(misses, parsed):
+                    self.extractor.cache_functions(key, extracted)
+                    per_file[i] = extracted
+        else:
+            for i in misses:
+                per_file[i] = self.extractor.extract_from_file(python_files[i])
+
+        for file_path, functions in zip(python_files, per_file):
+            # Every miss was filled in above
+            assert functions is not None
+            # Filter functions based on criteria
+            filtered_functions = self.extractor.filter_functions(
+                functions,
+                min_lines=self.min_function_lines,
+                exclude_test_files=True,
+                exclude_private=False,
+            )
+
+            self._indexed_files[file_path] = filtered_functions
+            self.existing_functions.extend(filtered_functions)
+
+        # Precompute similarity features once instead of once per comparison
+        self.similarity_analyzer.prepare(self.existing_functions)
+        if self.cache is not None:
+            self.cache.save()
+        if not self.similarity_analyzer.requires_body_content:
+            # Bodies are only needed again by reporters, which reload them lazily
+            for func in self.existing_functions:
+                func.release_body()
 
         self.console.print(
             f"[green]Indexed {len(self.existing_functions)} functions from codebase[/green]"
         )
 
+    def _list_python_files(self) -> List[Path]:
+        """
+        List the Python files of the repository.
+
+        Reads the git index (plus untracked files that are not ignored)
+        instead of walking the file system, which is much faster and skips
+        ignored directories such as virtualenvs. Falls back to a file system
+        walk when the path is not inside a git repository.
+
+        Returns:
+            Paths of the Python files under the repository path
+        """
+        try:
+            result = subprocess.run(
+                [
+                    "git", "ls-files", "-z", "--cached", "--others",
+                    "--exclude-standard", "--", "*.py",
+                ],
+                capture_output=True,
+                cwd=self.repo_path,
+            )
+        except OSError:
+            result = None
+
+        if result is None or result.returncode != 0:
+            return list(self.repo_path.glob("**/*.py"))
+
+        # A file can be listed twice while it has merge conflicts
+        paths = dict.fromkeys(result.stdout.decode("utf-8").split("\0"))
+        return [self.repo_path / path for path in paths if path]
+
     def _get_changed_functions(
         self, file_path: str, base_sha: str, head_sha: str
     ) -> List[CodeFunction]:
@@ -161,6 +293,16 @@ class DuplicateLogicDetector:
             List of functions that appear to be new or modified
         """
         try:
+            # Test files never contribute functions; skip parsing them
+            if self.extractor._is_test_file(file_path):
+                return []
+
+            # Changed files are usually part of the index just built from
+            # the same working tree, so their functions are already known
+            indexed_functions = self._indexed_files.get(Path(file_path))
+            if indexed_functions is not None:
+                return list(indexed_functions)
+
             # Extract functions from the current version
             current_functions = self.extractor.extract_from_file(file_path)
             
@@ -195,36 +337,119 @@ class DuplicateLogicDetector:
         Returns:
             List of duplicate matches for this function
         """
-        matches = []
+        return self._find_matches([new_func])
+
+    def _find_matches(self, new_functions: List[CodeFunction]) -> List[DuplicateMatch]:
+        """
+        Find existing functions similar to any of the new functions.
+
+        By default all pairs are scored with a single similarity-matrix call
+        so that vectorized or multi-threaded kernels can be used.
+
+        Args:
+            new_functions: The new functions to compare against existing ones
+
+        Returns:
+            List of duplicate matches for these functions
+        """
+        return [
+            DuplicateMatch(
+                new_function=new_func,
+                existing_function=existing_func,
+                similarity_score=similarity_score,
+            )
+            for new_func, existing_func, similarity_score in self._iter_candidate_pairs(
+                new_functions
+            )
+        ]
+
+    def _iter_candidate_pairs(
+        self, new_functions: List[CodeFunction]
+    ) -> Iterator[Tuple[CodeFunction, CodeFunction, float]]:
+        """
+        Yield every (new, existing, score) pair that passes its threshold.
+
+        Args:
+            new_functions: The new functions to compare against existing ones
+
+        Yields:
+            Tuples of ``(new_function, existing_function, similarity_score)``
+        """
+        if not new_functions or not self.existing_functions:
+            return
+
+        new_table = FunctionTable.from_functions(new_functions)
+        existing_table = FunctionTable.from_functions(self.existing_functions)
+
+        # Thresholds only depend on the file path, so resolve them once
+        get_threshold = self.threshold_config.get_threshold_for_file
+        new_thresholds = [get_threshold(path) for path in new_table.paths]
+        existing_thresholds = [get_threshold(path) for path in existing_table.paths]
+
+        # No pair can be reported below the smallest effective threshold,
+        # so the analyzer may skip exact scoring for pairs that cannot reach it
+        min_score = max(min(new_thresholds), min(existing_thresholds))
+
+        for i, j, similarity_score in self._score_pairs(new_functions, min_score):
+            # Only include matches above the configured threshold
+            # Check both file paths and use the more strict (higher) threshold
+            if (
+                similarity_score < new_thresholds[i]
+                or similarity_score < existing_thresholds[j]
+            ):
+                continue
 
-        for existing_func in self.existing_functions:
             # Skip if it's the same function (same file and name)
             if (
-                existing_func.file_path == new_func.file_path
-                and existing_func.name == new_func.name
+                existing_table.paths[j] == new_table.paths[i]
+                and existing_table.names[j] == new_table.names[i]
             ):
                 continue
 
-            # Calculate similarity
-            similarity_score = self.similarity_analyzer.calculate_similarity(
-                new_func, existing_func
-            )
+            yield new_table.functions[i], existing_table.functions[j], similarity_score
 
-            # Only include matches above the configured threshold
-            # Check both file paths and use the more strict (higher) threshold
-            new_threshold = self.threshold_config.get_threshold_for_file(new_func.file_path)
-            existing_threshold = self.threshold_config.get_threshold_for_file(existing_func.file_path)
-            effective_threshold = max(new_threshold, existing_threshold)
-            
-            if similarity_score >= effective_threshold:
-                match = DuplicateMatch(
-                    new_function=new_func,
-                    existing_function=existing_func,
-                    similarity_score=similarity_score,
-                )
-                matches.append(match)
+    def _score_pairs(
+        self, new_functions: List[CodeFunction], min_score: float
+    ) -> Iterator[Tuple[int, int, float]]:
+        """
+        Score new functions against the index.
 
-        return matches
+        By default every pair is scored in one batched call and only pairs
+        reaching ``min_score`` are returned. With ``min_shared_ngrams`` set or
+        the ``minhash_lsh`` index, only candidate pairs found from token
+        n-grams are scored, one at a time.
+
+        Args:
+            new_functions: The new functions to compare against existing ones
+            min_score: Lowest score the caller will report
+
+        Yields:
+            Tuples of ``(new_index, existing_index, similarity_score)``
+        """
+        if self.min_shared_ngrams is not None:
+            candidates = self.similarity_analyzer.find_candidate_pairs(
+                new_functions,
+                self.existing_functions,
+                min_shared=self.min_shared_ngrams,
+            )
+        elif self.index == "minhash_lsh":
+            candidates = self.similarity_analyzer.find_lsh_candidate_pairs(
+                new_functions, self.existing_functions, threshold=max(min_score, 0.5)
+            )
+        else:
+            # Vectorized kernels hand back only the cells above min_score
+            yield from self.similarity_analyzer.calculate_pairs(
+                new_functions,
+                self.existing_functions,
+                min_score=min_score,
+                n_jobs=self.n_jobs,
+            )
+            return
+
+        for i, j in sorted(candidates):
+            yield i, j, self.similarity_analyzer.calculate_similarity(
+                new_functions[i], self.existing_functions[j], min_score=min_score
+            )
 
     def get_configuration_info(self) -> dict:
         """Get information about the current detector configuration."""
@@ -247,17 +472,19 @@ class DuplicateLogicDetector:
     def print_configuration(self) -> None:
         """Print the current detector configuration."""
         config = self.get_configuration_info()
-        
-        self.console.print("[bold blue]Duplicate Logic Detector Configuration[/bold blue]")
-        self.console.print(f"Repository: {config['repository_path']}")
-        self.console.print(f"Similarity Method: {config['similarity_method']}")
-        self.console.print(f"Description: {config['similarity_description']}")
-        self.console.print(f"Min Function Lines: {config['min_function_lines']}")
-        self.console.print(f"Indexed Functions: {config['indexed_functions']}")
-        
-        # Print threshold configuration
-        self.console.print("")
-        self.threshold_config.print_configuration()
+
+        # Render everything in one print so the terminal is written once
+        lines = [
+            "[bold blue]Duplicate Logic Detector Configuration[/bold blue]",
+            f"Repository: {config['repository_path']}",
+            f"Similarity Method: {config['similarity_method']}",
+            f"Description: {config['similarity_description']}",
+            f"Min Function Lines: {config['min_function_lines']}",
+            f"Indexed Functions: {config['indexed_functions']}",
+            "",
+        ]
+        lines.extend(self.threshold_config.get_configuration_lines())
+        self.console.print("\n".join(lines))
 
 
 class GitChangeAnalyzer:
@@ -307,6 +534,48 @@ class GitChangeAnalyzer:
             self.console.print(f"[red]Error getting file content: {e}[/red]")
             return ""
 
+    def get_file_statuses(self, base_sha: str, head_sha: str) -> Dict[str, str]:
+        """
+        Get the status of every file changed between two commits in one git call.
+
+        Args:
+            base_sha: Base commit SHA
+            head_sha: Head commit SHA
+
+        Returns:
+            Mapping of file path (the new path for renames and copies) to its
+            status letter ("A", "M", "D", "R", ...), or an empty dict on error
+        """
+        try:
+            result = subprocess.run(
+                ["git", "diff", "--name-status", "-z", base_sha, head_sha],
+                capture_output=True,
+                cwd=self.repo_path,
+            )
+
+            if result.returncode != 0:
+                return {}
+
+            # NUL-separated: status, path (and a second path for R/C)
+            fields = result.stdout.decode("utf-8").split("\0")
+            statuses = {}
+            i = 0
+            while i + 1 < len(fields):
+                status = fields[i][:1]
+                if status in ("R", "C"):
+                    path = fields[i + 2]
+                    i += 3
+                else:
+                    path = fields[i + 1]
+                    i += 2
+                statuses[path] = status
+
+            return statuses
+
+        except Exception as e:
+            self.console.print(f"[red]Error getting changed files: {e}[/red]")
+            return {}
+
     def get_changed_lines(self, file_path: str, base_sha: str, head_sha: str) -> List[int]:
         """
         Get the line numbers that changed in a file between two commits.
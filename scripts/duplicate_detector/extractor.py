@@ -6,14 +6,145 @@ along with their metadata.
 """
 
 import ast
+import mmap
+import os
 import re
+import sys
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
 from rich.console import Console
 
+from .cache import AnalysisCache
 from .models import CodeFunction
 
+# (name, signature, line_start, line_end) of one extracted function
+_FunctionRecord = Tuple[str, str, int, int]
+
+
+# Patterns used by normalize_code, compiled once instead of per line
+_COMMENT_RE = re.compile(r"#.*$", re.MULTILINE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Below this size a plain read is cheaper than setting up a memory map
+_MMAP_MIN_SIZE = 16 * 1024
+
+
+def _read_source(file_path: Path) -> str:
+    """
+    Read and decode a UTF-8 source file.
+
+    Large files are decoded straight from a memory map, so the raw bytes are
+    never copied into a Python bytes object alongside the decoded text.
+    CRLF and CR line endings are translated to LF, as in a text-mode read.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        File content
+
+    Raises:
+        OSError: If the file cannot be read
+        UnicodeDecodeError: If the file is not valid UTF-8
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_MIN_SIZE:
+            content = f.read().decode("utf-8")
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                content = str(mm, "utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+# Function definitions are statements, so only these nodes can contain one
+_BLOCK_NODE_TYPES = (ast.stmt, ast.excepthandler, ast.match_case)
+
+
+def _iter_function_nodes(
+    tree: ast.AST,
+) -> Iterator[Union[ast.FunctionDef, ast.AsyncFunctionDef]]:
+    """
+    Yield every function definition in a syntax tree.
+
+    This visits functions in the same breadth-first order as ``ast.walk``
+    but never descends into expressions, which make up most of the tree.
+
+    Args:
+        tree: Parsed module (or any node)
+
+    Yields:
+        FunctionDef and AsyncFunctionDef nodes
+    """
+    pending = deque([tree])
+    while pending:
+        node = pending.popleft()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield node
+        pending.extend(
+            child
+            for child in ast.iter_child_nodes(node)
+            if isinstance(child, _BLOCK_NODE_TYPES)
+        )
+
+
+def _unparse_annotation(node: ast.expr) -> str:
+    """
+    Render an annotation expression as source text.
+
+    Plain names and dotted attribute chains, by far the most common
+    annotations, are joined directly; anything else goes through
+    ``ast.unparse``, which gives the same text for those simple cases.
+
+    Args:
+        node: Annotation expression
+
+    Returns:
+        Source text of the annotation
+    """
+    parts = []
+    current = node
+    while isinstance(current, ast.Attribute):
+        parts.append(current.attr)
+        current = current.value
+    if isinstance(current, ast.Name):
+        parts.append(current.id)
+        return ".".join(reversed(parts))
+    return ast.unparse(node)
+
+
+@lru_cache(maxsize=4096)
+def _is_test_path(file_path: str) -> bool:
+    """
+    Check if a file path appears to be a test file.
+
+    Results are cached because the same paths (and directory layouts) are
+    checked once per file during indexing and again for every changed file.
+
+    Args:
+        file_path: Path to check
+
+    Returns:
+        True if the file appears to be a test file
+    """
+    path = Path(file_path)
+    name = path.name.lower()
+    parent_names = [p.name.lower() for p in path.parents]
+
+    # Common test file patterns
+    test_patterns = [
+        name.startswith('test_'),
+        name.endswith('_test.py'),
+        'test' in parent_names,
+        'tests' in parent_names,
+    ]
+
+    return any(test_patterns)
+
 
 class PythonFunctionExtractor:
     """
@@ -24,14 +155,21 @@ class PythonFunctionExtractor:
     line numbers, and body content.
     """
 
-    def __init__(self, console: Optional[Console] = None):
+    _CACHE_NAMESPACE = "functions_v1"
+
+    def __init__(
+        self, console: Optional[Console] = None, cache: Optional[AnalysisCache] = None
+    ):
         """
         Initialize the function extractor.
         
         Args:
             console: Optional Rich console for output. If None, creates a new one.
+            cache: Persistent cache for the functions found in each file, keyed
+                by file content so unchanged files are not parsed again
         """
         self.console = console or Console()
+        self.cache = cache
 
     def extract_from_file(self, file_path: Union[str, Path]) -> List[CodeFunction]:
         """
@@ -43,28 +181,110 @@ class PythonFunctionExtractor:
         Returns:
             List of CodeFunction objects found in the file
         """
+        with_key = self.cache is not None
+        return self.extract_keyed_from_file(file_path, with_key)[1]
+
+    def extract_keyed_from_file(
+        self, file_path: Union[str, Path], with_key: bool = True
+    ) -> Tuple[Optional[bytes], List[CodeFunction]]:
+        """
+        Extract all functions from a Python file, reading it only once.
+
+        Args:
+            file_path: Path to the Python file to analyze
+            with_key: Whether to hash the text that was parsed, so functions
+                extracted without a cache (e.g. in a worker process) can be
+                stored later with ``cache_functions``
+
+        Returns:
+            Cache key of the parsed text (None if not requested or the file
+            could not be read) and the CodeFunction objects found in the file
+        """
         file_path = Path(file_path)
         
         if not file_path.exists():
             self.console.print(f"[red]File not found: {file_path}[/red]")
-            return []
+            return None, []
 
         if not file_path.suffix == '.py':
             self.console.print(f"[yellow]Skipping non-Python file: {file_path}[/yellow]")
-            return []
+            return None, []
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
+            content = _read_source(file_path)
+            key = AnalysisCache.content_key(content) if with_key else None
 
-            return self.extract_from_content(content, str(file_path))
+            functions = self._lookup_cached(key, content, str(file_path))
+            if functions is None:
+                functions = self.extract_from_content(content, str(file_path))
+                self._store_cached(key, functions)
+            return key, functions
 
         except UnicodeDecodeError:
             self.console.print(f"[red]Unable to decode file: {file_path}[/red]")
-            return []
+            return None, []
         except Exception as e:
             self.console.print(f"[red]Error reading {file_path}: {e}[/red]")
-            return []
+            return None, []
+
+    def get_cached_functions(
+        self, file_path: Union[str, Path]
+    ) -> Optional[List[CodeFunction]]:
+        """
+        Get the functions of a file from the cache, without parsing it.
+
+        Args:
+            file_path: Path to the Python file
+
+        Returns:
+            The cached functions, or None if there is no cache, no entry for
+            the current content, or the file cannot be read
+        """
+        if self.cache is None:
+            return None
+        try:
+            content = _read_source(Path(file_path))
+        except (OSError, UnicodeDecodeError):
+            return None
+        key = AnalysisCache.content_key(content)
+        return self._lookup_cached(key, content, str(file_path))
+
+    def cache_functions(
+        self, key: Optional[bytes], functions: List[CodeFunction]
+    ) -> None:
+        """
+        Store functions extracted elsewhere (e.g. in a worker process) in the cache.
+
+        Args:
+            key: Cache key of the text the functions were extracted from, as
+                returned by ``extract_keyed_from_file``
+            functions: All functions extracted from the file, unfiltered
+        """
+        self._store_cached(key, functions)
+
+    def _lookup_cached(
+        self, key: Optional[bytes], content: str, file_path: str
+    ) -> Optional[List[CodeFunction]]:
+        """Rebuild the functions cached for ``content``, or return None on a miss."""
+        if self.cache is None or key is None:
+            return None
+        records = self.cache.get(self._CACHE_NAMESPACE, key)
+        if records is None:
+            return None
+        return self._functions_from_records(records, content, file_path)
+
+    def _store_cached(
+        self, key: Optional[bytes], functions: List[CodeFunction]
+    ) -> None:
+        """Cache the functions extracted from the text hashed to ``key``."""
+        # Files without any functions are not stored
+        if self.cache is None or key is None or not functions:
+            return
+        self.cache.put(
+            self._CACHE_NAMESPACE,
+            key,
+            [(f.name, f.signature, f.line_start, f.line_end) for f in functions],
+        )
 
     def extract_from_content(self, content: str, file_path: str) -> List[CodeFunction]:
         """
@@ -81,11 +301,13 @@ class PythonFunctionExtractor:
             tree = ast.parse(content, filename=file_path)
             functions = []
 
-            for node in ast.walk(tree):
-                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    func = self._extract_function_info(node, content, file_path)
-                    if func:
-                        functions.append(func)
+            # Split once per file; every function slices its body from these
+            lines = content.split("\n")
+
+            for node in _iter_function_nodes(tree):
+                func = self._extract_function_info(node, lines, file_path)
+                if func:
+                    functions.append(func)
 
             return functions
 
@@ -96,10 +318,39 @@ class PythonFunctionExtractor:
             self.console.print(f"[red]Error parsing {file_path}: {e}[/red]")
             return []
 
+    @staticmethod
+    def _functions_from_records(
+        records: List[_FunctionRecord], content: str, file_path: str
+    ) -> List[CodeFunction]:
+        """
+        Rebuild cached functions without parsing the file again.
+
+        Args:
+            records: Cached ``(name, signature, line_start, line_end)`` tuples
+            content: Full source code content the records were derived from
+            file_path: Path to the file
+
+        Returns:
+            List of CodeFunction objects in their original order
+        """
+        lines = content.split("\n")
+        # ast.parse interns identifiers; unpickled names need it done explicitly
+        return [
+            CodeFunction._unchecked(
+                name=sys.intern(name),
+                file_path=file_path,
+                line_start=line_start,
+                line_end=line_end,
+                signature=signature,
+                body_content="\n".join(lines[line_start - 1:line_end]),
+            )
+            for name, signature, line_start, line_end in records
+        ]
+
     def _extract_function_info(
         self,
         node: Union[ast.FunctionDef, ast.AsyncFunctionDef],
-        content: str,
+        lines: List[str],
         file_path: str,
     ) -> Optional[CodeFunction]:
         """
@@ -107,7 +358,7 @@ class PythonFunctionExtractor:
         
         Args:
             node: AST node representing the function
-            content: Full source code content
+            lines: Full source code content split into lines
             file_path: Path to the file
             
         Returns:
@@ -115,7 +366,6 @@ class PythonFunctionExtractor:
         """
         try:
             signature = self._get_function_signature(node)
-            lines = content.split("\n")
             
             line_start = node.lineno
             line_end = node.end_lineno or line_start
@@ -124,7 +374,7 @@ class PythonFunctionExtractor:
             body_lines = lines[line_start - 1:line_end]  # AST uses 1-based line numbers
             body_content = "\n".join(body_lines)
 
-            return CodeFunction(
+            return CodeFunction._unchecked(
                 name=node.name,
                 file_path=file_path,
                 line_start=line_start,
@@ -156,7 +406,7 @@ class PythonFunctionExtractor:
             arg_str = arg.arg
             if arg.annotation:
                 try:
-                    arg_str += f": {ast.unparse(arg.annotation)}"
+                    arg_str += f": {_unparse_annotation(arg.annotation)}"
                 except Exception:
                     # Fallback if unparse fails
                     arg_str += ": <annotation>"
@@ -167,7 +417,7 @@ class PythonFunctionExtractor:
             vararg = f"*{node.args.vararg.arg}"
             if node.args.vararg.annotation:
                 try:
-                    vararg += f": {ast.unparse(node.args.vararg.annotation)}"
+                    vararg += f": {_unparse_annotation(node.args.vararg.annotation)}"
                 except Exception:
                     vararg += ": <annotation>"
             args.append(vararg)
@@ -177,7 +427,7 @@ class PythonFunctionExtractor:
             kwarg = f"**{node.args.kwarg.arg}"
             if node.args.kwarg.annotation:
                 try:
-                    kwarg += f": {ast.unparse(node.args.kwarg.annotation)}"
+                    kwarg += f": {_unparse_annotation(node.args.kwarg.annotation)}"
                 except Exception:
                     kwarg += ": <annotation>"
             args.append(kwarg)
@@ -186,7 +436,7 @@ class PythonFunctionExtractor:
         returns = ""
         if node.returns:
             try:
-                returns = f" -> {ast.unparse(node.returns)}"
+                returns = f" -> {_unparse_annotation(node.returns)}"
             except Exception:
                 returns = " -> <return_annotation>"
 
@@ -206,15 +456,11 @@ class PythonFunctionExtractor:
         Returns:
             Normalized code string
         """
-        lines = []
-        for line in code.split("\n"):
-            # Remove comments
-            line = re.sub(r"#.*$", "", line)
-            # Normalize whitespace
-            line = re.sub(r"\s+", " ", line.strip())
-            if line:  # Skip empty lines
-                lines.append(line)
-        return "\n".join(lines)
+        # Remove comments from every line in one pass
+        code = _COMMENT_RE.sub("", code)
+        # Normalize whitespace, skipping empty lines
+        lines = (_WHITESPACE_RE.sub(" ", line.strip()) for line in code.split("\n"))
+        return "\n".join(line for line in lines if line)
 
     def filter_functions(
         self,
@@ -264,16 +510,4 @@ class PythonFunctionExtractor:
         Returns:
             True if the file appears to be a test file
         """
-        path = Path(file_path)
-        name = path.name.lower()
-        parent_names = [p.name.lower() for p in path.parents]
-
-        # Common test file patterns
-        test_patterns = [
-            name.startswith('test_'),
-            name.endswith('_test.py'),
-            'test' in parent_names,
-            'tests' in parent_names,
-        ]
-
-        return any(test_patterns)
+        return _is_test_path(str(file_path))
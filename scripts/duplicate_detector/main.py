@@ -11,12 +11,75 @@ This is the main entry point that uses the modular duplicate_detector package.
 import argparse
 import os
 import sys
+import traceback
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List
 
-from rich.console import Console
+if TYPE_CHECKING:
+    from rich.console import Console
 
-from .detector import DuplicateLogicDetector
-from .reporters import MultiFormatReporter
-from .thresholds import create_threshold_config_from_env
+    from .models import MatchSet
+    from .reporters import MultiFormatReporter
+
+
+def _write_file(path: str, data: bytes, append: bool = False) -> None:
+    """
+    Write ``data`` to ``path`` through a single file descriptor.
+
+    The bytes go straight to ``os.write``, without Python's buffering layer.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if append else os.O_TRUNC)
+    fd = os.open(path, flags, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _repo_relative(path: str, repo_path: str) -> str:
+    """Normalize a changed-file path to the repo-relative form git reports."""
+    if os.path.isabs(path):
+        path = os.path.relpath(path, repo_path)
+    return os.path.normpath(path)
+
+
+def _create_console(output_format: str) -> "Console":
+    """Create the console used for progress and info messages."""
+    from rich.console import Console
+
+    if output_format == "console":
+        return Console()
+    # Progress and info messages are diagnostics here: keep them out of
+    # the report on stdout and skip styling for captured CI logs
+    return Console(stderr=True, force_terminal=False, no_color=True, highlight=False)
+
+
+def _write_github_outputs(
+    match_set: "MatchSet", reporter: "MultiFormatReporter", console: "Console"
+) -> None:
+    """Write the GitHub Actions step outputs and the report files."""
+    _write_file(
+        os.environ["GITHUB_OUTPUT"],
+        (
+            f"duplicates_found={'true' if match_set else 'false'}\n"
+            f"match_count={len(match_set)}\n"
+        ).encode("utf-8"),
+        append=True,
+    )
+
+    # The comment is only posted when there is something to report;
+    # the JSON artifact is always produced
+    formats = ("github", "json") if match_set else ("json",)
+    reports = reporter.generate_reports(match_set, formats, encoded=True)
+
+    if match_set:
+        _write_file("duplicate-logic-report.md", reports["github"])
+    else:
+        console.print("[green]No significant duplicates found[/green]")
+
+    _write_file("duplicate-logic-report.json", reports["json"])
 
 
 def main():
@@ -51,24 +114,109 @@ def main():
         "--folder-thresholds",
         help="Per-folder thresholds as JSON string. Overrides environment variable."
     )
+    parser.add_argument(
+        "--max-matches",
+        type=int,
+        help="Keep only this many of the highest-scoring matches (default: keep all)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.getenv("DUPLICATE_DETECTOR_CACHE_DIR"),
+        help="Directory for a persistent analysis cache reused across runs "
+        "(default: disabled)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the persistent analysis cache, even if --cache-dir or its "
+        "environment variable is set"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Parallel workers for indexing and similarity scoring "
+        "(-1 for all cores; default: per step)"
+    )
+    parser.add_argument(
+        "--min-shared-ngrams",
+        type=int,
+        help="Only score pairs sharing at least this many token 3-grams "
+        "(faster, approximate)"
+    )
+    parser.add_argument(
+        "--index",
+        choices=["exhaustive", "minhash_lsh"],
+        default="exhaustive",
+        help="How candidate pairs are chosen: score all pairs, or only pairs found by "
+        "MinHash LSH (faster on large codebases, approximate)"
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        default=bool(os.getenv("RUNNER_DEBUG")),
+        help="Print full tracebacks on errors (default: on when RUNNER_DEBUG is set)"
+    )
 
     args = parser.parse_args()
 
-    console = Console()
+    # Parse changed files before loading the analysis modules, so early
+    # exits do not pay their import cost. Only Python files are analyzed.
+    if args.changed_files:
+        changed_files = [
+            f for f in (line.strip() for line in args.changed_files.splitlines())
+            if f.endswith(".py")
+        ]
+    else:
+        print("No changed files provided", file=sys.stderr)
+        return 1
+
+    if not changed_files:
+        print("No Python files changed")
+        if args.output_format == "github-actions":
+            # The workflow still reads the step outputs and the JSON artifact
+            from .models import MatchSet
+            from .reporters import MultiFormatReporter
+
+            console = _create_console(args.output_format)
+            _write_github_outputs(
+                MatchSet.from_matches([]), MultiFormatReporter(console), console
+            )
+        return 0
+
+    console = _create_console(args.output_format)
 
     try:
-        # Parse changed files
-        if args.changed_files:
-            changed_files = [
-                f.strip() for f in args.changed_files.strip().split("\n") if f.strip()
-            ]
-        else:
-            console.print("[red]No changed files provided[/red]")
-            return 1
+        from .detector import DuplicateLogicDetector, GitChangeAnalyzer
+        from .models import MatchSet
+        from .reporters import MultiFormatReporter
+        from .thresholds import create_threshold_config_from_env
 
-        if not changed_files:
-            console.print("[green]No Python files changed[/green]")
-            return 0
+        # Classify every change with one git call so that files deleted
+        # between the two commits, and files identical in both (which git
+        # does not report), are skipped. Git reports repo-relative paths, so
+        # the given ones are normalized before the lookup.
+        if args.base_sha and args.head_sha:
+            git = GitChangeAnalyzer(Path(args.repository_path), console)
+            file_statuses = git.get_file_statuses(args.base_sha, args.head_sha)
+            if file_statuses:
+                skipped: Dict[str, List[str]] = {"deleted": [], "unchanged": []}
+                kept: List[str] = []
+                for path in changed_files:
+                    status = file_statuses.get(
+                        _repo_relative(path, args.repository_path)
+                    )
+                    if status == "D":
+                        skipped["deleted"].append(path)
+                    elif status is None:
+                        skipped["unchanged"].append(path)
+                    else:
+                        kept.append(path)
+                for label, paths in skipped.items():
+                    if paths:
+                        console.print(
+                            f"Skipping {len(paths)} {label} file(s): {', '.join(paths)}"
+                        )
+                changed_files = kept
 
         # Create threshold configuration
         if args.global_threshold is not None or args.folder_thresholds is not None:
@@ -88,7 +236,11 @@ def main():
             repository_path=args.repository_path,
             similarity_method=args.similarity_method,
             threshold_config=threshold_config,
-            console=console
+            console=console,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            n_jobs=args.jobs,
+            min_shared_ngrams=args.min_shared_ngrams,
+            index=args.index,
         )
 
         # Show configuration
@@ -99,52 +251,44 @@ def main():
         matches = detector.analyze_pr_changes(
             changed_files, 
             args.base_sha, 
-            args.head_sha
+            args.head_sha,
+            max_matches=args.max_matches,
         )
 
+        # Sort and partition once for all report formats
+        match_set = MatchSet.from_matches(matches)
+
         # Generate reports
         reporter = MultiFormatReporter(console)
 
         if args.output_format == "console":
-            reporter.generate_report(matches, "console")
+            reporter.generate_report(match_set, "console")
             
         elif args.output_format == "github-actions":
-            # Write GitHub Actions outputs
-            if matches:
-                with open(os.environ["GITHUB_OUTPUT"], "a") as f:
-                    f.write("duplicates_found=true\n")
-                    f.write(f"match_count={len(matches)}\n")
-
-                # Generate GitHub comment
-                comment = reporter.generate_report(matches, "github")
-                with open("duplicate-logic-report.md", "w") as f:
-                    f.write(comment)
-
-            else:
-                with open(os.environ["GITHUB_OUTPUT"], "a") as f:
-                    f.write("duplicates_found=false\n")
-                    f.write("match_count=0\n")
-                console.print("[green]No significant duplicates found[/green]")
-
-            # Generate JSON report for artifacts
-            json_report = reporter.generate_report(matches, "json")
-            with open("duplicate-logic-report.json", "w") as f:
-                f.write(json_report)
+            _write_github_outputs(match_set, reporter, console)
 
         elif args.output_format == "json":
-            json_report = reporter.generate_report(matches, "json")
+            json_report = reporter.generate_report(match_set, "json")
             print(json_report)
             
         elif args.output_format == "markdown":
-            markdown_report = reporter.generate_report(matches, "markdown")
+            markdown_report = reporter.generate_report(match_set, "markdown")
             print(markdown_report)
 
         return 0
 
     except Exception as e:
-        console.print(f"[red]Error: {e}[/red]")
-        import traceback
-        console.print(f"[red]Traceback: {traceback.format_exc()}[/red]")
+        print(f"Error: {type(e).__name__}: {e}", file=sys.stderr)
+        if args.debug:
+            traceback.print_exc()
+        if args.output_format == "github-actions":
+            # Keep the traceback for post-mortems without cluttering the log
+            try:
+                _write_file(
+                    "duplicate-logic-report.err", traceback.format_exc().encode("utf-8")
+                )
+            except OSError:
+                pass
         return 1
 
 
@@ -4,32 +4,194 @@ Data models for the duplicate logic detector.
 This module contains the core data structures used throughout the duplicate detection process.
 """
 
-from dataclasses import dataclass
-from typing import Any, Dict
+import mmap
+from bisect import bisect_right
+from collections.abc import Sequence as SequenceABC
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Union,
+    overload,
+)
 
+# Lower score bound of each confidence level above "Very Low"
+CONFIDENCE_BINS = (0.4, 0.6, 0.8)
+CONFIDENCE_LABELS = ("Very Low", "Low", "Medium", "High")
 
-@dataclass
+
+def confidence_label(similarity_score: float) -> str:
+    """
+    Map a similarity score to a human-readable confidence level.
+
+    Args:
+        similarity_score: Score between 0.0 and 1.0
+
+    Returns:
+        One of ``CONFIDENCE_LABELS``
+    """
+    return CONFIDENCE_LABELS[bisect_right(CONFIDENCE_BINS, similarity_score)]
+
+
+def _read_line_range(file_path: str, line_start: int, line_end: int) -> str:
+    """
+    Read lines ``line_start``..``line_end`` (1-based, inclusive) from a file.
+
+    The file is memory-mapped so only the pages covering the requested lines
+    are touched. Files with CRLF or CR line endings are split as a text-mode
+    read would split them, so the lines match what the extractor saw.
+
+    Args:
+        file_path: Path to the source file
+        line_start: First line to read
+        line_end: Last line to read
+
+    Returns:
+        The lines joined by newlines, or an empty string if the file cannot be read
+    """
+    try:
+        with open(file_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(b"\r") != -1:
+                    content = str(mm, "utf-8").replace("\r\n", "\n").replace("\r", "\n")
+                    return "\n".join(content.split("\n")[line_start - 1:line_end])
+
+                start = 0
+                for _ in range(line_start - 1):
+                    start = mm.find(b"\n", start) + 1
+                    if start == 0:
+                        return ""
+
+                end = start
+                for _ in range(line_end - line_start + 1):
+                    newline = mm.find(b"\n", end)
+                    if newline == -1:
+                        end = len(mm)
+                        break
+                    end = newline + 1
+
+                return mm[start:end].decode("utf-8").removesuffix("\n")
+    except (OSError, ValueError):
+        # ValueError covers empty files, which cannot be memory-mapped
+        return ""
+
+
+@dataclass(slots=True, init=False, eq=False)
 class CodeFunction:
-    """Represents a function extracted from Python code."""
+    """
+    Represents a function extracted from Python code.
+
+    Instances are slotted because one is kept per function in the codebase.
+    They are not frozen: the body can be released and similarity features
+    are cached on the instance.
+    """
 
     name: str
     file_path: str
     line_start: int
     line_end: int
     signature: str
-    body_content: str
+    _body: Optional[str] = field(default=None, repr=False)
+    # Features cached by the similarity calculators (see similarity.py)
+    _tokens: Optional[FrozenSet[str]] = field(default=None, repr=False)
+    _fingerprint: Optional[int] = field(default=None, repr=False)
+    _shingles: Optional[FrozenSet[int]] = field(default=None, repr=False)
 
-    def __post_init__(self):
-        """Validate the function data after initialization."""
-        if not self.name:
+    def __init__(
+        self,
+        name: str,
+        file_path: str,
+        line_start: int,
+        line_end: int,
+        signature: str,
+        body_content: Optional[str] = None,
+    ) -> None:
+        """Validate and store the fields (see ``_unchecked`` for trusted input)."""
+        if not name:
             raise ValueError("Function name cannot be empty")
-        if not self.file_path:
+        if not file_path:
             raise ValueError("File path cannot be empty")
-        if self.line_start <= 0:
+        if line_start <= 0:
             raise ValueError("Line start must be positive")
-        if self.line_end < self.line_start:
+        if line_end < line_start:
             raise ValueError("Line end must be >= line start")
 
+        self._set_fields(name, file_path, line_start, line_end, signature, body_content)
+
+    @classmethod
+    def _unchecked(
+        cls,
+        name: str,
+        file_path: str,
+        line_start: int,
+        line_end: int,
+        signature: str,
+        body_content: Optional[str] = None,
+    ) -> "CodeFunction":
+        """
+        Build a CodeFunction without validating the fields.
+
+        Used by the extractor, whose names and line numbers come from AST
+        nodes (or cached records of them) and are valid by construction.
+        """
+        func = cls.__new__(cls)
+        func._set_fields(name, file_path, line_start, line_end, signature, body_content)
+        return func
+
+    def _set_fields(
+        self,
+        name: str,
+        file_path: str,
+        line_start: int,
+        line_end: int,
+        signature: str,
+        body_content: Optional[str],
+    ) -> None:
+        """Assign the fields and reset the cached similarity features."""
+        self.name = name
+        self.file_path = file_path
+        self.line_start = line_start
+        self.line_end = line_end
+        self.signature = signature
+        self._body = body_content
+        self._clear_cached_features()
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the public fields, including the (possibly reloaded) body."""
+        if not isinstance(other, CodeFunction):
+            return NotImplemented
+        return (
+            self.name == other.name
+            and self.file_path == other.file_path
+            and self.line_start == other.line_start
+            and self.line_end == other.line_end
+            and self.signature == other.signature
+            and self.body_content == other.body_content
+        )
+
+    @property
+    def body_content(self) -> str:
+        """
+        Source text of the function.
+
+        The text is kept in ``_body`` while available. Once released, it is
+        re-read from the function's file and line range on access.
+        """
+        if self._body is None:
+            return _read_line_range(self.file_path, self.line_start, self.line_end)
+        return self._body
+
+    @body_content.setter
+    def body_content(self, value: Optional[str]) -> None:
+        self._body = value
+        # Anything derived from the old body is now stale
+        self._clear_cached_features()
+
     @property
     def line_count(self) -> int:
         """Get the number of lines in the function."""
@@ -40,6 +202,22 @@ class CodeFunction:
         """Check if this is a small function (< 5 lines)."""
         return self.line_count < 5
 
+    def _clear_cached_features(self) -> None:
+        """Forget similarity features derived from the body text."""
+        self._tokens = None
+        self._fingerprint = None
+        self._shingles = None
+
+    def release_body(self) -> None:
+        """
+        Drop the in-memory body text.
+
+        Subsequent reads of ``body_content`` load the text from ``file_path``
+        on demand, so only code that actually needs the source (e.g. reporters)
+        pays for it.
+        """
+        self._body = None
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
         return {
@@ -54,6 +232,45 @@ class CodeFunction:
 
 
 @dataclass
+class FunctionTable:
+    """
+    Column-oriented view of a list of functions.
+
+    Hot loops that touch the same attributes of every function (e.g. pairing
+    new functions with the index) read these parallel lists instead of going
+    through per-instance attribute lookups. Row ``i`` describes ``functions[i]``.
+    """
+
+    functions: Sequence[CodeFunction]
+    names: List[str]
+    paths: List[str]
+    line_starts: List[int]
+    line_ends: List[int]
+
+    @classmethod
+    def from_functions(cls, functions: Sequence[CodeFunction]) -> "FunctionTable":
+        """
+        Build a table from a sequence of functions.
+
+        Args:
+            functions: Functions to lay out column by column
+
+        Returns:
+            FunctionTable with one row per function
+        """
+        return cls(
+            functions=functions,
+            names=[func.name for func in functions],
+            paths=[func.file_path for func in functions],
+            line_starts=[func.line_start for func in functions],
+            line_ends=[func.line_end for func in functions],
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+@dataclass(frozen=True, slots=True)
 class DuplicateMatch:
     """Represents a potential duplicate logic match between two functions."""
 
@@ -61,7 +278,7 @@ class DuplicateMatch:
     existing_function: CodeFunction
     similarity_score: float
 
-    def __post_init__(self):
+    def __post_init__(self) -> None:
         """Validate the match data after initialization."""
         if not isinstance(self.new_function, CodeFunction):
             raise TypeError("new_function must be a CodeFunction instance")
@@ -73,14 +290,7 @@ class DuplicateMatch:
     @property
     def confidence_level(self) -> str:
         """Get a human-readable confidence level."""
-        if self.similarity_score >= 0.8:
-            return "High"
-        elif self.similarity_score >= 0.6:
-            return "Medium"
-        elif self.similarity_score >= 0.4:
-            return "Low"
-        else:
-            return "Very Low"
+        return confidence_label(self.similarity_score)
 
     @property
     def is_high_confidence(self) -> bool:
@@ -95,3 +305,56 @@ class DuplicateMatch:
             "similarity_score": self.similarity_score,
             "confidence_level": self.confidence_level,
         }
+
+
+@dataclass
+class MatchSet(SequenceABC):
+    """
+    Matches sorted by similarity score (highest first).
+
+    The high-confidence matches form a prefix of the sorted list, so they
+    are located once here instead of being filtered again by every reporter.
+    A MatchSet can be used anywhere a sequence of matches is expected.
+    """
+
+    matches: List[DuplicateMatch]
+    high_confidence: List[DuplicateMatch]
+
+    @classmethod
+    def from_matches(cls, matches: Iterable[DuplicateMatch]) -> "MatchSet":
+        """
+        Sort matches and partition off the high-confidence ones.
+
+        Args:
+            matches: Matches in any order; an existing MatchSet is returned as is
+
+        Returns:
+            MatchSet over the sorted matches
+        """
+        if isinstance(matches, MatchSet):
+            return matches
+
+        ordered = sorted(matches, key=lambda m: m.similarity_score, reverse=True)
+        split = 0
+        while split < len(ordered) and ordered[split].is_high_confidence:
+            split += 1
+        return cls(matches=ordered, high_confidence=ordered[:split])
+
+    @property
+    def other(self) -> List[DuplicateMatch]:
+        """Get the matches below high confidence, still sorted."""
+        return self.matches[len(self.high_confidence):]
+
+    @overload
+    def __getitem__(self, index: int) -> DuplicateMatch: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[DuplicateMatch]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[DuplicateMatch, List[DuplicateMatch]]:
+        return self.matches[index]
+
+    def __len__(self) -> int:
+        return len(self.matches)
@@ -7,22 +7,46 @@ including console output, GitHub PR comments, and JSON reports.
 
 import json
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from types import ModuleType
+from typing import Any, Dict, List, Literal, Optional, Sequence, Union, overload
 
 from rich.console import Console
 from rich.table import Table
 
-from .models import DuplicateMatch
+from .models import (
+    CONFIDENCE_LABELS,
+    CodeFunction,
+    DuplicateMatch,
+    MatchSet,
+    confidence_label,
+)
+
+_orjson: Optional[ModuleType]
+try:
+    # Optional C JSON encoder; the stdlib encoder is used otherwise
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    _orjson = None
 
 
 class ReportGenerator(ABC):
     """Abstract base class for report generators."""
 
     @abstractmethod
-    def generate(self, matches: List[DuplicateMatch]) -> str:
-        """Generate a report from duplicate matches."""
+    def generate(self, matches: Sequence[DuplicateMatch]) -> str:
+        """
+        Generate a report from duplicate matches.
+
+        Args:
+            matches: Matches to report; a MatchSet is used as is, any other
+                sequence is sorted and partitioned first
+        """
         pass
 
+    def generate_bytes(self, matches: Sequence[DuplicateMatch]) -> bytes:
+        """Generate the report encoded as UTF-8, ready to write to a binary file."""
+        return self.generate(matches).encode("utf-8")
+
 
 class ConsoleReportGenerator(ReportGenerator):
     """Generates formatted console reports using Rich."""
@@ -36,12 +60,13 @@ class ConsoleReportGenerator(ReportGenerator):
         """
         self.console = console or Console()
 
-    def generate(self, matches: List[DuplicateMatch]) -> str:
+    def generate(self, matches: Sequence[DuplicateMatch]) -> str:
         """Generate and print a console report."""
         if not matches:
             self.console.print("[green]✅ No duplicate logic detected![/green]")
             return "No duplicates found"
 
+        match_set = MatchSet.from_matches(matches)
         table = Table(title="Duplicate Logic Detection Results")
         table.add_column("New Function", style="cyan", no_wrap=False)
         table.add_column("Existing Function", style="magenta", no_wrap=False)
@@ -49,7 +74,7 @@ class ConsoleReportGenerator(ReportGenerator):
         table.add_column("Confidence", style="green", justify="center")
 
         # Show top 10 matches
-        for match in matches[:10]:
+        for match in match_set[:10]:
             table.add_row(
                 f"{match.new_function.name}\n{match.new_function.file_path}",
                 f"{match.existing_function.name}\n{match.existing_function.file_path}",
@@ -60,8 +85,8 @@ class ConsoleReportGenerator(ReportGenerator):
         self.console.print(table)
 
         # Summary
-        total_matches = len(matches)
-        high_confidence = len([m for m in matches if m.is_high_confidence])
+        total_matches = len(match_set)
+        high_confidence = len(match_set.high_confidence)
         
         self.console.print(f"\n[bold]Summary:[/bold]")
         self.console.print(f"  Total matches: {total_matches}")
@@ -89,51 +114,79 @@ class ConsoleReportGenerator(ReportGenerator):
 class GitHubCommentGenerator(ReportGenerator):
     """Generates GitHub PR comment reports."""
 
-    def generate(self, matches: List[DuplicateMatch]) -> str:
+    def generate(self, matches: Sequence[DuplicateMatch]) -> str:
         """Generate a GitHub PR comment with duplicate logic findings."""
         if not matches:
             return ""
 
-        comment = "## 🔍 Duplicate Logic Detection\n\n"
-        comment += "The following functions in your PR may recreate logic that already exists:\n\n"
+        match_set = MatchSet.from_matches(matches)
+
+        parts: List[str] = [
+            "## 🔍 Duplicate Logic Detection\n\n",
+            "The following functions in your PR may recreate logic that already exists:\n\n",
+        ]
 
         # Show top 5 matches in the comment to keep it concise
-        for i, match in enumerate(matches[:5], 1):
-            comment += f"### Match {i}: {match.confidence_level} Confidence\n"
-            comment += f"**New Function:** `{match.new_function.name}` in `{match.new_function.file_path}`\n"
-            comment += f"**Similar to:** `{match.existing_function.name}` in `{match.existing_function.file_path}`\n"
-            comment += f"**Similarity:** {match.similarity_score:.1%}\n\n"
+        for i, match in enumerate(match_set[:5], 1):
+            parts.append(f"### Match {i}: {match.confidence_level} Confidence\n")
+            parts.append(f"**New Function:** `{match.new_function.name}` in `{match.new_function.file_path}`\n")
+            parts.append(f"**Similar to:** `{match.existing_function.name}` in `{match.existing_function.file_path}`\n")
+            parts.append(f"**Similarity:** {match.similarity_score:.1%}\n\n")
 
         # Add summary if there are more matches
-        total_matches = len(matches)
+        total_matches = len(match_set)
         if total_matches > 5:
-            comment += f"*... and {total_matches - 5} more matches. Check the full report for details.*\n\n"
+            parts.append(f"*... and {total_matches - 5} more matches. Check the full report for details.*\n\n")
 
         # Add information section
-        comment += "<details>\n<summary>ℹ️ About this check</summary>\n\n"
-        comment += "This automated analysis compares new functions against the existing codebase "
-        comment += "to identify potential code duplication.\n\n"
-        comment += "**Confidence Levels:**\n"
-        comment += "- **High** (≥80%): Very likely duplicate, consider refactoring\n"
-        comment += "- **Medium** (60-79%): Potential duplicate, review recommended\n"
-        comment += "- **Low** (40-59%): Some similarity detected, may be coincidental\n\n"
-        comment += "Please review these matches to avoid code duplication and improve maintainability.\n"
-        comment += "</details>"
+        parts.extend([
+            "<details>\n<summary>ℹ️ About this check</summary>\n\n",
+            "This automated analysis compares new functions against the existing codebase ",
+            "to identify potential code duplication.\n\n",
+            "**Confidence Levels:**\n",
+            "- **High** (≥80%): Very likely duplicate, consider refactoring\n",
+            "- **Medium** (60-79%): Potential duplicate, review recommended\n",
+            "- **Low** (40-59%): Some similarity detected, may be coincidental\n\n",
+            "Please review these matches to avoid code duplication and improve maintainability.\n",
+            "</details>",
+        ])
 
-        return comment
+        return "".join(parts)
 
 
 class JSONReportGenerator(ReportGenerator):
     """Generates JSON reports for programmatic consumption."""
 
-    def generate(self, matches: List[DuplicateMatch]) -> str:
+    def generate(self, matches: Sequence[DuplicateMatch]) -> str:
         """Generate a JSON report of all findings."""
         report_data = self._create_report_dict(matches)
+        if _orjson is not None:
+            text: str = _orjson.dumps(report_data, option=_orjson.OPT_INDENT_2).decode()
+            return text
         return json.dumps(report_data, indent=2)
 
-    def _create_report_dict(self, matches: List[DuplicateMatch]) -> Dict[str, Any]:
+    def generate_bytes(self, matches: Sequence[DuplicateMatch]) -> bytes:
+        """Generate the JSON report as UTF-8 bytes (no str round trip with orjson)."""
+        if _orjson is not None:
+            data: bytes = _orjson.dumps(
+                self._create_report_dict(matches), option=_orjson.OPT_INDENT_2
+            )
+            return data
+        return super().generate_bytes(matches)
+
+    def _create_report_dict(self, matches: Sequence[DuplicateMatch]) -> Dict[str, Any]:
         """Create a dictionary representation of the report."""
-        high_confidence = [m for m in matches if m.is_high_confidence]
+        matches = MatchSet.from_matches(matches)
+        high_confidence = matches.high_confidence
+
+        # The same function usually appears in many matches; serialize it once
+        function_dicts: Dict[int, Dict[str, Any]] = {}
+
+        def function_dict(func: CodeFunction) -> Dict[str, Any]:
+            key = id(func)
+            if key not in function_dicts:
+                function_dicts[key] = func.to_dict()
+            return function_dicts[key]
         
         return {
             "summary": {
@@ -141,21 +194,29 @@ class JSONReportGenerator(ReportGenerator):
                 "high_confidence_matches": len(high_confidence),
                 "analysis_complete": True,
             },
-            "matches": [match.to_dict() for match in matches],
+            "matches": [
+                {
+                    "new_function": function_dict(match.new_function),
+                    "existing_function": function_dict(match.existing_function),
+                    "similarity_score": match.similarity_score,
+                    "confidence_level": match.confidence_level,
+                }
+                for match in matches
+            ],
             "statistics": {
                 "confidence_distribution": self._get_confidence_distribution(matches),
                 "avg_similarity_score": self._get_average_similarity(matches),
             }
         }
 
-    def _get_confidence_distribution(self, matches: List[DuplicateMatch]) -> Dict[str, int]:
+    def _get_confidence_distribution(self, matches: Sequence[DuplicateMatch]) -> Dict[str, int]:
         """Get distribution of confidence levels."""
-        distribution = {"High": 0, "Medium": 0, "Low": 0, "Very Low": 0}
+        distribution = dict.fromkeys(reversed(CONFIDENCE_LABELS), 0)
         for match in matches:
-            distribution[match.confidence_level] += 1
+            distribution[confidence_label(match.similarity_score)] += 1
         return distribution
 
-    def _get_average_similarity(self, matches: List[DuplicateMatch]) -> float:
+    def _get_average_similarity(self, matches: Sequence[DuplicateMatch]) -> float:
         """Calculate average similarity score."""
         if not matches:
             return 0.0
@@ -165,54 +226,55 @@ class JSONReportGenerator(ReportGenerator):
 class MarkdownReportGenerator(ReportGenerator):
     """Generates detailed Markdown reports."""
 
-    def generate(self, matches: List[DuplicateMatch]) -> str:
+    def generate(self, matches: Sequence[DuplicateMatch]) -> str:
         """Generate a detailed Markdown report."""
         if not matches:
             return "# Duplicate Logic Detection Report\n\n✅ No duplicate logic detected!"
 
-        report = "# Duplicate Logic Detection Report\n\n"
+        parts: List[str] = ["# Duplicate Logic Detection Report\n\n"]
         
         # Summary section
-        total_matches = len(matches)
-        high_confidence = len([m for m in matches if m.is_high_confidence])
+        match_set = MatchSet.from_matches(matches)
+        total_matches = len(match_set)
+        high_confidence = len(match_set.high_confidence)
         
-        report += f"## Summary\n\n"
-        report += f"- **Total matches found:** {total_matches}\n"
-        report += f"- **High confidence matches:** {high_confidence}\n"
-        report += f"- **Analysis date:** {self._get_current_date()}\n\n"
+        parts.append("## Summary\n\n")
+        parts.append(f"- **Total matches found:** {total_matches}\n")
+        parts.append(f"- **High confidence matches:** {high_confidence}\n")
+        parts.append(f"- **Analysis date:** {self._get_current_date()}\n\n")
 
         # High confidence matches first
         if high_confidence > 0:
-            report += "## High Confidence Matches\n\n"
-            for i, match in enumerate([m for m in matches if m.is_high_confidence], 1):
-                report += self._format_match_markdown(match, i)
+            parts.append("## High Confidence Matches\n\n")
+            for i, match in enumerate(match_set.high_confidence, 1):
+                parts.append(self._format_match_markdown(match, i))
 
         # Other matches
-        other_matches = [m for m in matches if not m.is_high_confidence]
+        other_matches = match_set.other
         if other_matches:
-            report += "## Other Potential Matches\n\n"
+            parts.append("## Other Potential Matches\n\n")
             for i, match in enumerate(other_matches, high_confidence + 1):
-                report += self._format_match_markdown(match, i)
+                parts.append(self._format_match_markdown(match, i))
 
-        return report
+        return "".join(parts)
 
     def _format_match_markdown(self, match: DuplicateMatch, index: int) -> str:
         """Format a single match as Markdown."""
-        md = f"### Match {index}: {match.confidence_level} Confidence\n\n"
-        md += f"**Similarity Score:** {match.similarity_score:.1%}\n\n"
-        
-        md += f"**New Function:**\n"
-        md += f"- Name: `{match.new_function.name}`\n"
-        md += f"- File: `{match.new_function.file_path}`\n"
-        md += f"- Lines: {match.new_function.line_start}-{match.new_function.line_end}\n\n"
-        
-        md += f"**Existing Function:**\n"
-        md += f"- Name: `{match.existing_function.name}`\n"
-        md += f"- File: `{match.existing_function.file_path}`\n"
-        md += f"- Lines: {match.existing_function.line_start}-{match.existing_function.line_end}\n\n"
-        
-        md += "---\n\n"
-        return md
+        new_func = match.new_function
+        existing_func = match.existing_function
+        return "".join([
+            f"### Match {index}: {match.confidence_level} Confidence\n\n",
+            f"**Similarity Score:** {match.similarity_score:.1%}\n\n",
+            "**New Function:**\n",
+            f"- Name: `{new_func.name}`\n",
+            f"- File: `{new_func.file_path}`\n",
+            f"- Lines: {new_func.line_start}-{new_func.line_end}\n\n",
+            "**Existing Function:**\n",
+            f"- Name: `{existing_func.name}`\n",
+            f"- File: `{existing_func.file_path}`\n",
+            f"- Lines: {existing_func.line_start}-{existing_func.line_end}\n\n",
+            "---\n\n",
+        ])
 
     def _get_current_date(self) -> str:
         """Get current date as string."""
@@ -243,12 +305,13 @@ class MultiFormatReporter:
             "markdown": MarkdownReportGenerator(),
         }
 
-    def generate_report(self, matches: List[DuplicateMatch], format_type: str) -> str:
+    def generate_report(self, matches: Sequence[DuplicateMatch], format_type: str) -> str:
         """
         Generate a report in the specified format.
         
         Args:
-            matches: List of duplicate matches to report
+            matches: Matches to report; pass a MatchSet to share one sort
+                and partition across several formats
             format_type: Type of report to generate ("console", "github", "json", "markdown")
             
         Returns:
@@ -257,24 +320,88 @@ class MultiFormatReporter:
         Raises:
             ValueError: If format_type is not supported
         """
+        self._check_format(format_type)
+        generator = self._generators[format_type]
+        return generator.generate(matches)
+
+    def _check_format(self, format_type: str) -> None:
+        """Raise ValueError if ``format_type`` is not supported."""
         if format_type not in self._generators:
             available = ", ".join(self._generators.keys())
             raise ValueError(f"Unsupported format '{format_type}'. Available: {available}")
 
-        generator = self._generators[format_type]
-        return generator.generate(matches)
+    @overload
+    def generate_reports(
+        self,
+        matches: Sequence[DuplicateMatch],
+        formats: Sequence[str] = ...,
+        encoded: Literal[False] = ...,
+    ) -> Dict[str, str]: ...
+
+    @overload
+    def generate_reports(
+        self,
+        matches: Sequence[DuplicateMatch],
+        formats: Sequence[str] = ...,
+        *,
+        encoded: Literal[True],
+    ) -> Dict[str, bytes]: ...
+
+    @overload
+    def generate_reports(
+        self,
+        matches: Sequence[DuplicateMatch],
+        formats: Sequence[str] = ...,
+        encoded: bool = ...,
+    ) -> Union[Dict[str, str], Dict[str, bytes]]: ...
+
+    def generate_reports(
+        self,
+        matches: Sequence[DuplicateMatch],
+        formats: Sequence[str] = ("github", "json"),
+        encoded: bool = False,
+    ) -> Union[Dict[str, str], Dict[str, bytes]]:
+        """
+        Generate several reports from one sorted and partitioned match set.
+
+        Args:
+            matches: Matches to report
+            formats: Report formats to generate
+            encoded: Return UTF-8 bytes for writing to binary files
+                instead of strings
+
+        Returns:
+            Mapping of format name to the generated report
+
+        Raises:
+            ValueError: If any format is not supported
+        """
+        match_set = MatchSet.from_matches(matches)
+        if not encoded:
+            return {
+                format_type: self.generate_report(match_set, format_type)
+                for format_type in formats
+            }
+
+        for format_type in formats:
+            self._check_format(format_type)
+        return {
+            format_type: self._generators[format_type].generate_bytes(match_set)
+            for format_type in formats
+        }
 
     def get_available_formats(self) -> List[str]:
         """Get list of available report formats."""
         return list(self._generators.keys())
 
-    def print_summary(self, matches: List[DuplicateMatch]) -> None:
+    def print_summary(self, matches: Sequence[DuplicateMatch]) -> None:
         """Print a quick summary to console."""
         if not matches:
             self.console.print("[green]✅ No duplicate logic detected![/green]")
             return
 
-        total = len(matches)
-        high_conf = len([m for m in matches if m.is_high_confidence])
+        match_set = MatchSet.from_matches(matches)
+        total = len(match_set)
+        high_conf = len(match_set.high_confidence)
         
         self.console.print(f"[yellow]Found {total} potential duplicates ({high_conf} high confidence)[/yellow]")
@@ -5,17 +5,293 @@ This module provides different algorithms for calculating similarity between cod
 Based on experimental results from the research phase.
 """
 
+import heapq
+import math
+import os
+import random
 import re
+import sys
+import zlib
 from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from difflib import SequenceMatcher
-from typing import Dict, Type
+from itertools import repeat
+from types import ModuleType
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
-from .models import CodeFunction
+from .cache import AnalysisCache
+from .models import CodeFunction, DuplicateMatch
+
+_RFIndel: Optional[ModuleType]
+_RFLevenshtein: Optional[ModuleType]
+_rf_cdist: Optional[Callable[..., Any]]
+try:
+    # Optional C implementations (bit-parallel Levenshtein / Indel)
+    from rapidfuzz.distance import Indel as _RFIndel
+    from rapidfuzz.distance import Levenshtein as _RFLevenshtein
+    from rapidfuzz.process import cdist as _rf_cdist
+except ImportError:  # pragma: no cover - depends on installed extras
+    _RFIndel = None
+    _RFLevenshtein = None
+    _rf_cdist = None
+
+_np: Optional[ModuleType]
+try:
+    # Optional sparse-matrix backend for batched Jaccard
+    import numpy as _np
+    from scipy.sparse import csr_matrix as _csr_matrix
+except ImportError:  # pragma: no cover - depends on installed extras
+    _np = None
+    _csr_matrix = None
+
+_numba: Optional[ModuleType] = None
+_levenshtein_distance_jit: Optional[Callable[..., int]] = None
+if _RFLevenshtein is None and _np is not None:
+    try:
+        # Optional JIT for the Levenshtein fallback; only worth importing
+        # when the rapidfuzz kernel is unavailable
+        import numba as _numba
+    except ImportError:  # pragma: no cover - depends on installed extras
+        _numba = None
+
+
+if _numba is not None and _np is not None:
+
+    def _levenshtein_distance_kernel(a: Any, b: Any, max_distance: float) -> int:
+        """
+        Two-row Levenshtein DP over code-point arrays, compiled by numba below.
+
+        Stops early once every cell of a row exceeds ``max_distance`` and
+        returns that row's minimum, a lower bound on the true distance.
+        """
+        len_b = b.shape[0]
+        # _np is set whenever this is compiled; mypy cannot see the guard
+        prev = _np.arange(len_b + 1)  # type: ignore[union-attr]
+        curr = _np.empty(len_b + 1, dtype=prev.dtype)  # type: ignore[union-attr]
+        for i in range(1, a.shape[0] + 1):
+            curr[0] = i
+            row_min = i
+            ca = a[i - 1]
+            for j in range(1, len_b + 1):
+                cost = 0 if ca == b[j - 1] else 1
+                curr[j] = min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + cost)
+                if curr[j] < row_min:
+                    row_min = curr[j]
+            if row_min > max_distance:
+                return row_min
+            prev, curr = curr, prev
+        return int(prev[len_b])
+
+    _levenshtein_distance_jit = _numba.njit(cache=True)(_levenshtein_distance_kernel)
+
+
+def _process_count(n_jobs: Optional[int]) -> int:
+    """Translate an ``n_jobs`` value into a number of processes (-1 means all cores)."""
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return os.cpu_count() or 1
+    return max(1, n_jobs)
+
+
+def _thread_count(n_jobs: Optional[int]) -> int:
+    """Translate ``n_jobs`` into rapidfuzz's ``workers`` (defaults to all cores)."""
+    if n_jobs is None or n_jobs < 0:
+        return -1
+    return max(1, n_jobs)
+
+
+_T = TypeVar("_T")
+
+
+def _row_chunks(rows: Sequence[_T], processes: int) -> List[Sequence[_T]]:
+    """Split ``rows`` into at most ``processes`` contiguous blocks."""
+    chunk_size = -(-len(rows) // processes)
+    return [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+
+
+def _score_rows(
+    calculator: "SimilarityCalculator",
+    funcs_a: Sequence[CodeFunction],
+    funcs_b: Sequence[CodeFunction],
+    min_score: float,
+) -> List[List[float]]:
+    """Score a block of rows; module-level so worker processes can unpickle it."""
+    return [
+        [calculator._calculate_bounded(a, b, min_score) for b in funcs_b]
+        for a in funcs_a
+    ]
+
+
+def _match_rows(
+    bodies_a: Sequence[str],
+    bodies_b: Sequence[str],
+    bounds: List[List[float]],
+    min_score: float,
+) -> List[List[float]]:
+    """
+    Replace the bounds of surviving pairs with their SequenceMatcher ratio.
+
+    Module-level so worker processes can unpickle it.
+    """
+    # SequenceMatcher caches its analysis of the second sequence, so one
+    # matcher per column scores every row against it without redoing it
+    matcher = SequenceMatcher(None)
+    for j, b in enumerate(bodies_b):
+        matcher.set_seq2(b)
+        for a, row in zip(bodies_a, bounds):
+            if a == b:
+                row[j] = 1.0
+            elif row[j] >= min_score:
+                matcher.set_seq1(a)
+                row[j] = matcher.ratio()
+    return bounds
+
+
+# Code tokens: identifiers, integers, comparison operators and punctuation
+_TOKEN_PATTERN = r"[A-Za-z_]\w*|\d+|==|!=|<=|>=|[\(\)\[\]\{\}\.,:;\+\-\*/%<>]"
+_TOKEN_RE = re.compile(_TOKEN_PATTERN)
+# On ASCII input this yields exactly the same tokens, but the regex engine
+# can skip Unicode category lookups for \w and \d
+_TOKEN_RE_ASCII = re.compile(_TOKEN_PATTERN, re.ASCII)
+
+# Shingles are hashed token n-grams of this length
+_SHINGLE_SIZE = 3
+# Rabin-Karp polynomial base and modulus (a Mersenne prime)
+_SHINGLE_BASE = 1_000_003
+_SHINGLE_MOD = (1 << 61) - 1
+
+
+def _get_shingles(func: CodeFunction) -> FrozenSet[int]:
+    """
+    Get the set of rolling hashes over a function's token n-grams.
+
+    Token hashes come from CRC32 so shingles are stable across processes.
+    The result is cached on the function.
+    """
+    shingles = func._shingles
+    if shingles is None:
+        body = func.body_content
+        token_re = _TOKEN_RE_ASCII if body.isascii() else _TOKEN_RE
+        token_hashes = [zlib.crc32(token.encode()) for token in token_re.findall(body)]
+        # Weight of the token leaving the window
+        leading = pow(_SHINGLE_BASE, _SHINGLE_SIZE - 1, _SHINGLE_MOD)
+        hashes = set()
+        rolling = 0
+        for position, token_hash in enumerate(token_hashes):
+            if position >= _SHINGLE_SIZE:
+                rolling -= token_hashes[position - _SHINGLE_SIZE] * leading
+            rolling = (rolling * _SHINGLE_BASE + token_hash) % _SHINGLE_MOD
+            if position >= _SHINGLE_SIZE - 1:
+                hashes.add(rolling)
+        shingles = frozenset(hashes)
+        func._shingles = shingles
+    return shingles
+
+
+# MinHash permutations are h(x) = (a * x + b) mod p over shingles reduced
+# mod p; with a 31-bit prime the products fit in 64-bit integers
+_MINHASH_PRIME = (1 << 31) - 1
+_MINHASH_SEED = 1
+
+
+def _minhash_signatures(
+    funcs: Sequence[CodeFunction], num_perm: int
+) -> List[Optional[Tuple[int, ...]]]:
+    """
+    Get the MinHash signature of every function's shingle set.
+
+    Functions without any shingle get None, since an empty set has no
+    meaningful signature.
+    """
+    rng = random.Random(_MINHASH_SEED)
+    params = [
+        (rng.randrange(1, _MINHASH_PRIME), rng.randrange(_MINHASH_PRIME))
+        for _ in range(num_perm)
+    ]
+
+    if _np is not None:
+        a = _np.array([p[0] for p in params], dtype=_np.uint64)[:, None]
+        b = _np.array([p[1] for p in params], dtype=_np.uint64)[:, None]
+
+    signatures: List[Optional[Tuple[int, ...]]] = []
+    for func in funcs:
+        shingles = _get_shingles(func)
+        if not shingles:
+            signatures.append(None)
+        elif _np is not None:
+            values = _np.fromiter(
+                (x % _MINHASH_PRIME for x in shingles),
+                dtype=_np.uint64,
+                count=len(shingles),
+            )
+            minima = ((a * values + b) % _MINHASH_PRIME).min(axis=1)
+            signatures.append(tuple(minima.tolist()))
+        else:
+            values = [x % _MINHASH_PRIME for x in shingles]
+            signatures.append(
+                tuple(
+                    min((pa * x + pb) % _MINHASH_PRIME for x in values)
+                    for pa, pb in params
+                )
+            )
+    return signatures
+
+
+def _lsh_band_rows(threshold: float, num_perm: int) -> int:
+    """
+    Choose how many signature rows form one LSH band.
+
+    A pair with shingle Jaccard ``s`` collides in some band with probability
+    ``1 - (1 - s**r)**b``, whose steep part sits near ``(1/b)**(1/r)``. The
+    most selective ``r`` keeping that point at or below ``threshold`` is
+    used, favoring recall.
+    """
+    best = 1
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows == 0 and (rows / num_perm) ** (1 / rows) <= threshold:
+            best = rows
+    return best
 
 
 class SimilarityCalculator(ABC):
     """Abstract base class for similarity calculation methods."""
 
+    # Registry name and human-readable description of the method. These are
+    # plain class attributes so they can be listed without instantiation.
+    name: ClassVar[str]
+    description: ClassVar[str]
+
+    # Whether calculate() reads body_content. Calculators that work from
+    # cached features set this to False so indexed bodies can be released.
+    requires_body_content: bool = True
+
+    # Optional persistent cache for per-function features, set by SimilarityAnalyzer
+    cache: Optional[AnalysisCache] = None
+
+    def prepare(self, funcs: Iterable[CodeFunction]) -> None:
+        """
+        Precompute any per-function data before a batch of comparisons.
+
+        Args:
+            funcs: Functions that are about to be compared
+        """
+
     @abstractmethod
     def calculate(self, func1: CodeFunction, func2: CodeFunction) -> float:
         """
@@ -30,17 +306,144 @@ class SimilarityCalculator(ABC):
         """
         pass
 
-    @property
-    @abstractmethod
-    def name(self) -> str:
-        """Get the name of this similarity method."""
-        pass
+    def upper_bound(self, func1: CodeFunction, func2: CodeFunction) -> float:
+        """
+        Get a cheap upper bound on ``calculate(func1, func2)``.
 
-    @property
-    @abstractmethod
-    def description(self) -> str:
-        """Get a description of this similarity method."""
-        pass
+        The default bound carries no information. Calculators override this
+        so hopeless pairs can be skipped before the full calculation.
+
+        Args:
+            func1: First function to compare
+            func2: Second function to compare
+
+        Returns:
+            A value that the real similarity score never exceeds
+        """
+        return 1.0
+
+    def _calculate_bounded(
+        self, func1: CodeFunction, func2: CodeFunction, min_score: float
+    ) -> float:
+        """
+        Calculate similarity, allowing any value below ``min_score`` for hopeless pairs.
+
+        The default returns the upper bound when it is below ``min_score``.
+        """
+        if min_score > 0.0:
+            bound = self.upper_bound(func1, func2)
+            if bound < min_score:
+                return bound
+        return self.calculate(func1, func2)
+
+    def calculate_matrix(
+        self,
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Sequence[CodeFunction],
+        min_score: float = 0.0,
+        n_jobs: Optional[int] = None,
+    ) -> List[List[float]]:
+        """
+        Calculate similarity for every pair in ``funcs_a`` x ``funcs_b``.
+
+        The default implementation loops over :meth:`calculate`. When both
+        arguments are the same sequence only the upper triangle is computed
+        and mirrored. With more than one job, blocks of rows are scored in
+        separate processes, since the pure-Python kernels hold the GIL.
+        Subclasses may override this with a batched kernel.
+
+        Args:
+            funcs_a: Functions for the rows of the matrix
+            funcs_b: Functions for the columns of the matrix
+            min_score: Scores below this value are not needed exactly; such
+                pairs may be reported with any value below ``min_score``
+            n_jobs: Number of worker processes (-1 for all cores, None or 1
+                for serial scoring)
+
+        Returns:
+            Row-major matrix where ``matrix[i][j]`` scores ``funcs_a[i]``
+            vs ``funcs_b[j]``
+        """
+        processes = min(_process_count(n_jobs), len(funcs_a))
+        if processes > 1:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                blocks = executor.map(
+                    _score_rows,
+                    repeat(self),
+                    _row_chunks(funcs_a, processes),
+                    repeat(funcs_b),
+                    repeat(min_score),
+                )
+                return [row for block in blocks for row in block]
+
+        if funcs_a is funcs_b:
+            size = len(funcs_a)
+            matrix = [[1.0] * size for _ in range(size)]
+            for i in range(size):
+                for j in range(i + 1, size):
+                    score = self._calculate_bounded(funcs_a[i], funcs_a[j], min_score)
+                    matrix[i][j] = score
+                    matrix[j][i] = score
+            return matrix
+
+        return _score_rows(self, funcs_a, funcs_b, min_score)
+
+    def _calculate_array(
+        self,
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Sequence[CodeFunction],
+        min_score: float,
+        n_jobs: Optional[int],
+    ) -> Optional[Any]:
+        """
+        Score all pairs into a NumPy array with a vectorized kernel.
+
+        Returns None when no vectorized kernel is available, in which case
+        callers fall back to :meth:`calculate_matrix`.
+        """
+        return None
+
+    def calculate_pairs(
+        self,
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Sequence[CodeFunction],
+        min_score: float = 0.0,
+        n_jobs: Optional[int] = None,
+    ) -> List[Tuple[int, int, float]]:
+        """
+        Get only the pairs scoring at least ``min_score``.
+
+        With a vectorized kernel the surviving cells are located with a
+        single array comparison, so the rest of the N x M scores never
+        become Python objects.
+
+        Args:
+            funcs_a: Functions for the rows of the matrix
+            funcs_b: Functions for the columns of the matrix
+            min_score: Lowest score to keep
+            n_jobs: Parallelism, as for :meth:`calculate_matrix`
+
+        Returns:
+            ``(i, j, score)`` tuples in row-major order
+        """
+        array = self._calculate_array(funcs_a, funcs_b, min_score, n_jobs)
+        if array is not None and _np is not None:
+            rows, cols = _np.nonzero(array >= min_score)
+            return list(zip(rows.tolist(), cols.tolist(), array[rows, cols].tolist()))
+
+        matrix = self.calculate_matrix(funcs_a, funcs_b, min_score, n_jobs)
+        return [
+            (i, j, score)
+            for i, scores in enumerate(matrix)
+            for j, score in enumerate(scores)
+            if score >= min_score
+        ]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle without the persistent cache, which stays in the parent process."""
+        state = self.__dict__.copy()
+        state.pop("cache", None)
+        return state
 
 
 class JaccardTokensSimilarity(SimilarityCalculator):
@@ -48,35 +451,246 @@ class JaccardTokensSimilarity(SimilarityCalculator):
     Jaccard similarity based on code tokens.
     
     Fast and reliable method that tokenizes code and computes Jaccard coefficient.
+    Batched scoring uses a scipy sparse matrix product when scipy is installed.
     Best for: General purpose, balanced speed/accuracy.
     """
 
-    def __init__(self):
-        self._token_re = re.compile(
-            r"[A-Za-z_]\w*|\d+|==|!=|<=|>=|[\(\)\[\]\{\}\.,:;\+\-\*/%<>]"
-        )
+    name = "jaccard_tokens"
+    description = "Token-based Jaccard similarity coefficient"
+    requires_body_content = False
 
-    @property
-    def name(self) -> str:
-        return "jaccard_tokens"
+    # Bump when the token pattern or fingerprint scheme changes
+    _CACHE_NAMESPACE = "jaccard_tokens_v1"
 
-    @property
-    def description(self) -> str:
-        return "Token-based Jaccard similarity coefficient"
+    def prepare(self, funcs: Iterable[CodeFunction]) -> None:
+        """
+        Tokenize and fingerprint every function once up front.
+
+        With a persistent cache attached, features of bodies seen in an
+        earlier run are loaded instead of recomputed.
+        """
+        if self.cache is None:
+            for func in funcs:
+                self._get_fingerprint(func)
+            return
+
+        for func in funcs:
+            if func._fingerprint is not None:
+                continue
+
+            key = AnalysisCache.content_key(func.body_content)
+            cached = self.cache.get(self._CACHE_NAMESPACE, key)
+            if cached is not None:
+                tokens, fingerprint = cached
+                # Unpickled strings are not interned
+                func._tokens = frozenset(map(sys.intern, tokens))
+                func._fingerprint = fingerprint
+            else:
+                self.cache.put(
+                    self._CACHE_NAMESPACE,
+                    key,
+                    (self._get_tokens(func), self._get_fingerprint(func)),
+                )
+
+    def _get_tokens(self, func: CodeFunction) -> FrozenSet[str]:
+        """Get the token set of a function, tokenizing it on first use."""
+        tokens = func._tokens
+        if tokens is None:
+            body = func.body_content
+            token_re = _TOKEN_RE_ASCII if body.isascii() else _TOKEN_RE
+            # Interned tokens are shared across every function's set, so equal
+            # tokens compare by identity and repeated names are stored once
+            tokens = frozenset(map(sys.intern, token_re.findall(body)))
+            func._tokens = tokens
+        return tokens
+
+    def _get_fingerprint(self, func: CodeFunction) -> int:
+        """
+        Get a 256-bit Bloom fingerprint of a function's token set.
+
+        Each token sets one bit chosen by a stable CRC32 hash, so the value
+        is the same across processes.
+        """
+        fingerprint = func._fingerprint
+        if fingerprint is None:
+            fingerprint = 0
+            for token in self._get_tokens(func):
+                fingerprint |= 1 << (zlib.crc32(token.encode()) & 0xFF)
+            func._fingerprint = fingerprint
+        return fingerprint
+
+    def upper_bound(self, func1: CodeFunction, func2: CodeFunction) -> float:
+        """
+        Bound Jaccard using token counts and Bloom fingerprints.
+
+        Every bit set in one fingerprint but not the other comes from at
+        least one token missing from the other set, which caps the
+        intersection size without touching the sets themselves.
+        """
+        size_a = len(self._get_tokens(func1))
+        size_b = len(self._get_tokens(func2))
+        if not size_a and not size_b:
+            return 1.0
+
+        fingerprint_a = self._get_fingerprint(func1)
+        fingerprint_b = self._get_fingerprint(func2)
+        max_intersection = min(
+            size_a - (fingerprint_a & ~fingerprint_b).bit_count(),
+            size_b - (fingerprint_b & ~fingerprint_a).bit_count(),
+        )
+        return max_intersection / (size_a + size_b - max_intersection)
 
     def calculate(self, func1: CodeFunction, func2: CodeFunction) -> float:
         """Calculate Jaccard similarity based on code tokens."""
-        tokens_a = set(self._token_re.findall(func1.body_content))
-        tokens_b = set(self._token_re.findall(func2.body_content))
+        tokens_a = self._get_tokens(func1)
+        tokens_b = self._get_tokens(func2)
 
         if not tokens_a and not tokens_b:
             return 1.0
 
+        # |A ∪ B| follows from the cached set sizes; no union set is built
         intersection = len(tokens_a & tokens_b)
-        union = len(tokens_a | tokens_b)
+        union = len(tokens_a) + len(tokens_b) - intersection
 
         return intersection / max(1, union)
 
+    def calculate_matrix(
+        self,
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Sequence[CodeFunction],
+        min_score: float = 0.0,
+        n_jobs: Optional[int] = None,
+    ) -> List[List[float]]:
+        """Score all pairs with a sparse matrix product when scipy is installed."""
+        array = self._calculate_array(funcs_a, funcs_b, min_score, n_jobs)
+        if array is None:
+            return super().calculate_matrix(funcs_a, funcs_b, min_score, n_jobs)
+        scores: List[List[float]] = array.tolist()
+        return scores
+
+    def _calculate_array(
+        self,
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Sequence[CodeFunction],
+        min_score: float,
+        n_jobs: Optional[int],
+    ) -> Optional[Any]:
+        """
+        Score all pairs with a sparse token-occurrence matrix product.
+
+        Each function becomes a 0/1 row over the shared token vocabulary, so
+        ``A @ B.T`` yields every intersection size in one sparse multiply and
+        the unions follow from the row sums.
+        """
+        if _np is None or _csr_matrix is None:
+            return None
+
+        vocabulary: Dict[str, int] = {}
+        rows_a = self._token_rows(funcs_a, vocabulary)
+        rows_b = rows_a if funcs_b is funcs_a else self._token_rows(funcs_b, vocabulary)
+
+        matrix_a = self._to_csr(rows_a, len(vocabulary))
+        matrix_b = (
+            matrix_a if funcs_b is funcs_a else self._to_csr(rows_b, len(vocabulary))
+        )
+
+        intersection = (matrix_a @ matrix_b.T).toarray()
+        sizes_a = matrix_a.getnnz(axis=1)
+        sizes_b = matrix_b.getnnz(axis=1)
+        union = sizes_a[:, None] + sizes_b[None, :] - intersection
+
+        # Two empty token sets are identical by definition
+        return _np.where(
+            union == 0, 1.0, intersection / _np.maximum(union, 1)
+        )
+
+    def calculate_pairs(
+        self,
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Sequence[CodeFunction],
+        min_score: float = 0.0,
+        n_jobs: Optional[int] = None,
+    ) -> List[Tuple[int, int, float]]:
+        """
+        Get only the pairs scoring at least ``min_score``.
+
+        Without scipy, pairs are found with an exact prefix filter over an
+        inverted token index instead of visiting every cell of the matrix.
+        """
+        if _csr_matrix is not None or min_score <= 0.0:
+            return super().calculate_pairs(funcs_a, funcs_b, min_score, n_jobs)
+
+        tokens_a = [self._get_tokens(func) for func in funcs_a]
+        tokens_b = [self._get_tokens(func) for func in funcs_b]
+
+        # Order tokens rarest first, so prefixes hit short posting lists
+        frequency: Counter = Counter()
+        for tokens in tokens_b:
+            frequency.update(tokens)
+        for tokens in tokens_a:
+            frequency.update(tokens)
+
+        def prefix(tokens: FrozenSet[str]) -> List[str]:
+            # Two sets reaching min_score share a token within the first
+            # |A| - ceil(min_score * |A|) + 1 of each; the epsilon only
+            # lengthens the prefix, so float rounding cannot drop a pair
+            size = len(tokens)
+            length = size - math.ceil(min_score * size - 1e-9) + 1
+            return sorted(tokens, key=lambda token: (frequency[token], token))[:length]
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        empty_b = []
+        for j, tokens in enumerate(tokens_b):
+            if not tokens:
+                empty_b.append(j)
+            for token in prefix(tokens):
+                postings[token].append(j)
+
+        pairs: List[Tuple[int, int, float]] = []
+        for i, tokens in enumerate(tokens_a):
+            if not tokens:
+                # Two empty token sets are identical by definition
+                pairs.extend((i, j, 1.0) for j in empty_b)
+                continue
+
+            candidates: Set[int] = set()
+            for token in prefix(tokens):
+                candidates.update(postings.get(token, ()))
+
+            for j in sorted(candidates):
+                intersection = len(tokens & tokens_b[j])
+                score = intersection / (len(tokens) + len(tokens_b[j]) - intersection)
+                if score >= min_score:
+                    pairs.append((i, j, score))
+        return pairs
+
+    def _token_rows(
+        self, funcs: Sequence[CodeFunction], vocabulary: Dict[str, int]
+    ) -> List[List[int]]:
+        """Map each function's tokens to column ids, growing the vocabulary."""
+        return [
+            [
+                vocabulary.setdefault(token, len(vocabulary))
+                for token in self._get_tokens(func)
+            ]
+            for func in funcs
+        ]
+
+    @staticmethod
+    def _to_csr(rows: List[List[int]], vocabulary_size: int) -> Any:
+        """Build a 0/1 CSR matrix from per-row column ids."""
+        indptr = [0]
+        indices: List[int] = []
+        for row in rows:
+            indices.extend(row)
+            indptr.append(len(indices))
+
+        assert _np is not None and _csr_matrix is not None
+        data = _np.ones(len(indices), dtype=_np.int32)
+        return _csr_matrix(
+            (data, indices, indptr), shape=(len(rows), max(1, vocabulary_size))
+        )
+
 
 class SequenceMatcherSimilarity(SimilarityCalculator):
     """
@@ -86,19 +700,92 @@ class SequenceMatcherSimilarity(SimilarityCalculator):
     Best for: Structural similarity detection.
     """
 
-    @property
-    def name(self) -> str:
-        return "sequence_matcher"
+    name = "sequence_matcher"
+    description = "Python's difflib.SequenceMatcher algorithm"
 
-    @property
-    def description(self) -> str:
-        return "Python's difflib.SequenceMatcher algorithm"
+    def upper_bound(self, func1: CodeFunction, func2: CodeFunction) -> float:
+        """
+        Bound the ratio 2*M/T without running SequenceMatcher.
+
+        The matching blocks form a common subsequence, so M never exceeds the
+        longest common subsequence. rapidfuzz's normalized Indel similarity is
+        exactly 2*LCS/T and is used when available; otherwise every character
+        of the shorter body is assumed to match.
+        """
+        a, b = func1.body_content, func2.body_content
+        length_bound = self._length_bound(a, b)
+
+        if _RFIndel is None:
+            return length_bound
+        lcs_bound: float = _RFIndel.normalized_similarity(a, b)
+        return min(length_bound, lcs_bound)
 
     def calculate(self, func1: CodeFunction, func2: CodeFunction) -> float:
         """Calculate similarity using SequenceMatcher."""
-        return SequenceMatcher(
-            None, func1.body_content, func2.body_content
-        ).ratio()
+        a, b = func1.body_content, func2.body_content
+        # Exact clones always match in full; skip the quadratic matching
+        if a == b:
+            return 1.0
+        return SequenceMatcher(None, a, b).ratio()
+
+    def calculate_matrix(
+        self,
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Sequence[CodeFunction],
+        min_score: float = 0.0,
+        n_jobs: Optional[int] = None,
+    ) -> List[List[float]]:
+        """
+        Bound all pairs, then run SequenceMatcher on the survivors.
+
+        Bounds come from one rapidfuzz call when it is installed and from
+        body lengths otherwise. With more than one job, blocks of rows are
+        matched in separate processes.
+        """
+        bodies_a = [f.body_content for f in funcs_a]
+        bodies_b = bodies_a if funcs_a is funcs_b else [f.body_content for f in funcs_b]
+
+        if _rf_cdist is None or _RFIndel is None or min_score <= 0.0:
+            # Only the plain serial path is reorganized; the symmetric and
+            # multi-process paths of the base class are kept
+            if funcs_a is funcs_b or _process_count(n_jobs) > 1:
+                return super().calculate_matrix(funcs_a, funcs_b, min_score, n_jobs)
+            bounds = [
+                [self._length_bound(a, b) for b in bodies_b] for a in bodies_a
+            ]
+        else:
+            try:
+                bounds = _rf_cdist(
+                    bodies_a,
+                    bodies_b,
+                    scorer=_RFIndel.normalized_similarity,
+                    dtype="float64",
+                    workers=_thread_count(n_jobs),
+                    # Bounds below the cutoff come back as 0.0 and are skipped
+                    score_cutoff=min_score,
+                ).tolist()
+            except ImportError:  # pragma: no cover - cdist needs numpy
+                return super().calculate_matrix(funcs_a, funcs_b, min_score, n_jobs)
+
+        processes = min(_process_count(n_jobs), len(bodies_a))
+        if processes > 1:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                blocks = executor.map(
+                    _match_rows,
+                    _row_chunks(bodies_a, processes),
+                    repeat(bodies_b),
+                    _row_chunks(bounds, processes),
+                    repeat(min_score),
+                )
+                return [row for block in blocks for row in block]
+
+        return _match_rows(bodies_a, bodies_b, bounds, min_score)
+
+    @staticmethod
+    def _length_bound(a: str, b: str) -> float:
+        """Bound the ratio by assuming every character of the shorter body matches."""
+        total = len(a) + len(b)
+        return 2 * min(len(a), len(b)) / total if total else 1.0
 
 
 class LevenshteinNormSimilarity(SimilarityCalculator):
@@ -109,18 +796,116 @@ class LevenshteinNormSimilarity(SimilarityCalculator):
     Best for: Catching subtle duplicates, strict duplicate detection.
     """
 
-    @property
-    def name(self) -> str:
-        return "levenshtein_norm"
+    name = "levenshtein_norm"
+    description = "Normalized Levenshtein distance"
 
-    @property
-    def description(self) -> str:
-        return "Normalized Levenshtein distance"
+    def upper_bound(self, func1: CodeFunction, func2: CodeFunction) -> float:
+        """Bound similarity by the length ratio; distance is at least the length gap."""
+        len_a, len_b = len(func1.body_content), len(func2.body_content)
+        longest = max(len_a, len_b)
+        return min(len_a, len_b) / longest if longest else 1.0
 
     def calculate(self, func1: CodeFunction, func2: CodeFunction) -> float:
         """Calculate similarity using normalized Levenshtein distance."""
-        a, b = func1.body_content, func2.body_content
+        return self._similarity(func1.body_content, func2.body_content, 0.0)
+
+    def _calculate_bounded(
+        self, func1: CodeFunction, func2: CodeFunction, min_score: float
+    ) -> float:
+        """Check the length bound, then let the kernel stop below ``min_score``."""
+        if min_score > 0.0:
+            bound = self.upper_bound(func1, func2)
+            if bound < min_score:
+                return bound
+        return self._similarity(func1.body_content, func2.body_content, min_score)
+
+    def _similarity(self, a: str, b: str, min_score: float) -> float:
+        """
+        Dispatch to the fastest available kernel.
+
+        Every kernel may stop early once ``min_score`` is out of reach and
+        then returns some value below it instead of the exact score.
+        """
+        if _RFLevenshtein is not None:
+            score: float = _RFLevenshtein.normalized_similarity(
+                a, b, score_cutoff=min_score
+            )
+            return score
+
+        if _levenshtein_distance_jit is not None:
+            return self._calculate_jit(a, b, min_score)
+
+        return self._calculate_python(a, b, min_score)
 
+    @staticmethod
+    def _max_distance(max_len: int, min_score: float) -> float:
+        """Largest distance that still reaches ``min_score`` (with float slack)."""
+        return (1.0 - min_score) * max_len + 1e-9
+
+    @staticmethod
+    def _calculate_jit(a: str, b: str, min_score: float = 0.0) -> float:
+        """Numba-compiled fallback used when rapidfuzz is not installed."""
+        if a == b:
+            return 1.0
+
+        max_len = max(len(a), len(b))
+        if min(len(a), len(b)) == 0:
+            return 0.0
+
+        # UTF-32 keeps one array element per character, matching str indexing
+        assert _np is not None and _levenshtein_distance_jit is not None
+        codes_a = _np.frombuffer(a.encode("utf-32-le"), dtype=_np.uint32)
+        codes_b = _np.frombuffer(b.encode("utf-32-le"), dtype=_np.uint32)
+        max_distance = LevenshteinNormSimilarity._max_distance(max_len, min_score)
+        distance = _levenshtein_distance_jit(codes_a, codes_b, max_distance)
+        return 1.0 - (distance / max_len)
+
+    def calculate_matrix(
+        self,
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Sequence[CodeFunction],
+        min_score: float = 0.0,
+        n_jobs: Optional[int] = None,
+    ) -> List[List[float]]:
+        """Score all pairs in one multi-threaded rapidfuzz call when available."""
+        array = self._calculate_array(funcs_a, funcs_b, min_score, n_jobs)
+        if array is None:
+            return super().calculate_matrix(funcs_a, funcs_b, min_score, n_jobs)
+        scores: List[List[float]] = array.tolist()
+        return scores
+
+    def _calculate_array(
+        self,
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Sequence[CodeFunction],
+        min_score: float,
+        n_jobs: Optional[int],
+    ) -> Optional[Any]:
+        """
+        Score all pairs with rapidfuzz's ``cdist``.
+
+        ``min_score`` is passed as rapidfuzz's ``score_cutoff``, so the
+        bit-parallel kernel can abandon a pair as soon as it cannot reach it;
+        such pairs score 0.0.
+        """
+        if _rf_cdist is None or _RFLevenshtein is None:
+            return None
+
+        try:
+            return _rf_cdist(
+                [f.body_content for f in funcs_a],
+                [f.body_content for f in funcs_b],
+                scorer=_RFLevenshtein.normalized_similarity,
+                dtype="float64",
+                workers=_thread_count(n_jobs),
+                score_cutoff=min_score if min_score > 0.0 else None,
+            )
+        except ImportError:  # pragma: no cover - cdist needs numpy
+            return None
+
+    @staticmethod
+    def _calculate_python(a: str, b: str, min_score: float = 0.0) -> float:
+        """Pure-Python fallback used when neither rapidfuzz nor numba is installed."""
         if a == b:
             return 1.0
 
@@ -128,6 +913,9 @@ class LevenshteinNormSimilarity(SimilarityCalculator):
         if len_a == 0 or len_b == 0:
             return 0.0
 
+        max_len = max(len_a, len_b)
+        max_distance = LevenshteinNormSimilarity._max_distance(max_len, min_score)
+
         # Calculate Levenshtein distance using dynamic programming
         prev = list(range(len_b + 1))
         for i in range(1, len_a + 1):
@@ -141,10 +929,16 @@ class LevenshteinNormSimilarity(SimilarityCalculator):
                     curr[j - 1] + 1,   # insertion
                     prev[j - 1] + cost # substitution
                 )
+
+            # Row minima never decrease, so once every cell is over the
+            # limit the pair cannot reach min_score; the row minimum still
+            # gives an upper bound on the similarity
+            row_min = min(curr)
+            if row_min > max_distance:
+                return 1.0 - (row_min / max_len)
             prev = curr
 
         distance = prev[len_b]
-        max_len = max(len_a, len_b)
         return 1.0 - (distance / max_len)
 
 
@@ -163,12 +957,15 @@ class SimilarityAnalyzer:
         "levenshtein_norm": LevenshteinNormSimilarity,
     }
 
-    def __init__(self, method: str = "jaccard_tokens"):
+    def __init__(
+        self, method: str = "jaccard_tokens", cache: Optional[AnalysisCache] = None
+    ):
         """
         Initialize the similarity analyzer.
         
         Args:
             method: Name of the similarity method to use
+            cache: Optional persistent cache for per-function features
             
         Raises:
             ValueError: If the specified method is not available
@@ -182,16 +979,20 @@ class SimilarityAnalyzer:
 
         self.method_name = method
         self._calculator = self._METHODS[method]()
+        self._calculator.cache = cache
 
     @classmethod
     def get_available_methods(cls) -> Dict[str, str]:
         """Get a dictionary of available methods and their descriptions."""
-        methods = {}
-        for name, calculator_class in cls._METHODS.items():
-            # Create a temporary instance to get the description
-            temp_calc = calculator_class()
-            methods[name] = temp_calc.description
-        return methods
+        return {
+            name: calculator_class.description
+            for name, calculator_class in cls._METHODS.items()
+        }
+
+    @property
+    def requires_body_content(self) -> bool:
+        """Whether the selected method reads function bodies when comparing."""
+        return self._calculator.requires_body_content
 
     @property
     def current_method(self) -> str:
@@ -203,13 +1004,28 @@ class SimilarityAnalyzer:
         """Get the description of the currently selected method."""
         return self._calculator.description
 
-    def calculate_similarity(self, func1: CodeFunction, func2: CodeFunction) -> float:
+    def prepare(self, funcs: Iterable[CodeFunction]) -> None:
+        """
+        Precompute per-function data for the selected method.
+
+        Args:
+            funcs: Functions that are about to be compared
+        """
+        self._calculator.prepare(funcs)
+
+    def calculate_similarity(
+        self, func1: CodeFunction, func2: CodeFunction, min_score: float = 0.0
+    ) -> float:
         """
         Calculate similarity between two functions.
         
         Args:
             func1: First function to compare
             func2: Second function to compare
+            min_score: Lowest score the caller cares about. If the pair
+                provably cannot reach it, some value below ``min_score``
+                (usually a cheap upper bound) is returned instead of the
+                exact score.
             
         Returns:
             Similarity score between 0.0 and 1.0
@@ -222,4 +1038,201 @@ class SimilarityAnalyzer:
         if not isinstance(func2, CodeFunction):
             raise TypeError("func2 must be a CodeFunction instance")
 
-        return self._calculator.calculate(func1, func2)
+        return self._calculator._calculate_bounded(func1, func2, min_score)
+
+    def calculate_matrix(
+        self,
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Sequence[CodeFunction],
+        min_score: float = 0.0,
+        n_jobs: Optional[int] = None,
+    ) -> List[List[float]]:
+        """
+        Calculate similarity between every pair of functions from two lists.
+
+        Args:
+            funcs_a: Functions for the rows of the matrix
+            funcs_b: Functions for the columns of the matrix
+            min_score: Lowest score the caller cares about. Pairs that provably
+                cannot reach it may be reported with any value below it.
+            n_jobs: Parallelism for the selected method. Kernels that release
+                the GIL (rapidfuzz) use it as a thread count and default to
+                all cores; pure-Python kernels use it as a process count and
+                default to serial. -1 means all cores.
+
+        Returns:
+            Row-major matrix where ``matrix[i][j]`` scores ``funcs_a[i]``
+            vs ``funcs_b[j]``
+        """
+        if not funcs_a or not funcs_b:
+            return [[] for _ in funcs_a]
+
+        return self._calculator.calculate_matrix(funcs_a, funcs_b, min_score, n_jobs)
+
+    def calculate_pairs(
+        self,
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Sequence[CodeFunction],
+        min_score: float = 0.0,
+        n_jobs: Optional[int] = None,
+    ) -> List[Tuple[int, int, float]]:
+        """
+        Get the pairs of functions from two lists that score at least ``min_score``.
+
+        Args:
+            funcs_a: First list of functions
+            funcs_b: Second list of functions
+            min_score: Lowest score to keep
+            n_jobs: Parallelism, as for :meth:`calculate_matrix`
+
+        Returns:
+            ``(i, j, score)`` tuples indexing ``funcs_a`` and ``funcs_b``,
+            in row-major order
+        """
+        if not funcs_a or not funcs_b:
+            return []
+
+        return self._calculator.calculate_pairs(funcs_a, funcs_b, min_score, n_jobs)
+
+    @staticmethod
+    def find_candidate_pairs(
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Optional[Sequence[CodeFunction]] = None,
+        min_shared: int = 3,
+    ) -> Set[Tuple[int, int]]:
+        """
+        Find pairs of functions that share enough token n-grams to be worth scoring.
+
+        Every function is reduced to Rabin-Karp hashes of its token 3-grams,
+        and an inverted index from hash to function finds the pairs sharing at
+        least ``min_shared`` of them. Pairs that share nothing, which is most
+        of them, are never visited. This is a heuristic: a pair below the
+        n-gram cutoff could still have scored above a similarity threshold.
+
+        Args:
+            funcs_a: First group of functions
+            funcs_b: Second group; if None, pairs within ``funcs_a`` are returned
+            min_shared: Minimum number of distinct shared n-gram hashes
+
+        Returns:
+            Set of ``(i, j)`` index pairs into ``funcs_a`` and ``funcs_b``
+            (with ``i < j`` when ``funcs_b`` is None)
+        """
+        same_group = funcs_b is None
+        if funcs_b is None:
+            funcs_b = funcs_a
+
+        index: Dict[int, List[int]] = defaultdict(list)
+        for j, func in enumerate(funcs_b):
+            for shingle in _get_shingles(func):
+                index[shingle].append(j)
+
+        pairs: Set[Tuple[int, int]] = set()
+        for i, func in enumerate(funcs_a):
+            shared: Counter = Counter()
+            for shingle in _get_shingles(func):
+                bucket = index.get(shingle)
+                if bucket:
+                    shared.update(bucket)
+            for j, count in shared.items():
+                if count >= min_shared and (not same_group or i < j):
+                    pairs.add((i, j))
+        return pairs
+
+    @staticmethod
+    def find_lsh_candidate_pairs(
+        funcs_a: Sequence[CodeFunction],
+        funcs_b: Optional[Sequence[CodeFunction]] = None,
+        threshold: float = 0.5,
+        num_perm: int = 128,
+    ) -> Set[Tuple[int, int]]:
+        """
+        Find likely similar pairs of functions with MinHash locality-sensitive hashing.
+
+        Each function's token 3-gram set is summarized by a MinHash
+        signature, which is cut into bands; functions sharing any band
+        become candidates. Expected cost is linear in the number of
+        functions. This is a heuristic: pairs whose n-gram overlap is below
+        ``threshold`` are likely, and pairs above it unlikely, to be missed.
+
+        Args:
+            funcs_a: First group of functions
+            funcs_b: Second group; if None, pairs within ``funcs_a`` are returned
+            threshold: Estimated n-gram Jaccard similarity around which pairs
+                start to be returned
+            num_perm: Number of hash permutations in each signature
+
+        Returns:
+            Set of ``(i, j)`` index pairs into ``funcs_a`` and ``funcs_b``
+            (with ``i < j`` when ``funcs_b`` is None)
+        """
+        same_group = funcs_b is None
+        if funcs_b is None:
+            funcs_b = funcs_a
+
+        rows = _lsh_band_rows(threshold, num_perm)
+        signatures_b = _minhash_signatures(funcs_b, num_perm)
+        signatures_a = (
+            signatures_b if same_group else _minhash_signatures(funcs_a, num_perm)
+        )
+
+        buckets: Dict[Tuple[int, ...], List[int]] = defaultdict(list)
+        for j, signature in enumerate(signatures_b):
+            if signature is not None:
+                for start in range(0, num_perm, rows):
+                    buckets[(start,) + signature[start:start + rows]].append(j)
+
+        pairs: Set[Tuple[int, int]] = set()
+        for i, signature in enumerate(signatures_a):
+            if signature is None:
+                continue
+            for start in range(0, num_perm, rows):
+                for j in buckets.get((start,) + signature[start:start + rows], ()):
+                    if not same_group or i < j:
+                        pairs.add((i, j))
+        return pairs
+
+    @staticmethod
+    def top_k_matches(
+        pairs: Iterable[Tuple[CodeFunction, CodeFunction, float]],
+        k: int,
+        threshold: float = 0.0,
+    ) -> List[DuplicateMatch]:
+        """
+        Keep only the ``k`` highest-scoring pairs from a stream of candidates.
+
+        A min-heap of size ``k`` is maintained while consuming ``pairs``, so
+        memory stays O(k) and DuplicateMatch objects are only built for the
+        survivors. Ties keep the earlier pair, matching a stable sort.
+
+        Args:
+            pairs: Iterable of ``(new_function, existing_function, score)``
+            k: Maximum number of matches to keep
+            threshold: Pairs scoring below this value are ignored
+
+        Returns:
+            Up to ``k`` matches sorted by similarity score (highest first)
+        """
+        if k <= 0:
+            return []
+
+        heap: List[Tuple[float, int, CodeFunction, CodeFunction]] = []
+        for index, (new_func, existing_func, score) in enumerate(pairs):
+            if score < threshold:
+                continue
+            # The negated index makes later pairs lose ties against earlier ones
+            entry = (score, -index, new_func, existing_func)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+        heap.sort(key=lambda entry: entry[:2], reverse=True)
+        return [
+            DuplicateMatch(
+                new_function=new_func,
+                existing_function=existing_func,
+                similarity_score=score,
+            )
+            for score, _, new_func, existing_func in heap
+        ]
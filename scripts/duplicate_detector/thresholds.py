@@ -6,7 +6,7 @@ supporting both global thresholds and per-folder thresholds.
 """
 
 import json
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from rich.console import Console
 
 
@@ -39,6 +39,19 @@ class ThresholdConfig:
         
         # Validate thresholds
         self._validate_thresholds()
+
+        # Normalized folder prefixes, most specific (longest) first. The sort
+        # is stable, so equally long folders keep their configured order.
+        # Empty prefixes are dropped since they never override the global value.
+        self._sorted_folders: List[Tuple[str, float]] = sorted(
+            (
+                (folder_path.strip("/"), folder_threshold)
+                for folder_path, folder_threshold in self.folder_thresholds.items()
+                if folder_path.strip("/")
+            ),
+            key=lambda item: -len(item[0]),
+        )
+        self._threshold_cache: Dict[str, float] = {}
     
     def _validate_thresholds(self) -> None:
         """Validate threshold values."""
@@ -60,23 +73,7 @@ class ThresholdConfig:
         Returns:
             True if match should be reported, False otherwise
         """
-        # Find the most specific folder threshold that matches the file path
-        threshold = self.global_threshold
-        longest_match = ""
-        
-        for folder_path, folder_threshold in self.folder_thresholds.items():
-            # Normalize paths for comparison
-            normalized_folder = folder_path.strip("/")
-            normalized_file = file_path.strip("/")
-            
-            # Check if the file is in this folder or its subdirectories
-            if normalized_file.startswith(normalized_folder + "/") or normalized_file.startswith(normalized_folder):
-                # Use the most specific (longest) matching folder path
-                if len(normalized_folder) > len(longest_match):
-                    threshold = folder_threshold
-                    longest_match = normalized_folder
-        
-        return similarity_score >= threshold
+        return similarity_score >= self.get_threshold_for_file(file_path)
     
     def get_threshold_for_file(self, file_path: str) -> float:
         """
@@ -88,22 +85,29 @@ class ThresholdConfig:
         Returns:
             Effective threshold for the file
         """
-        threshold = self.global_threshold
-        longest_match = ""
-        
-        for folder_path, folder_threshold in self.folder_thresholds.items():
-            # Normalize paths for comparison
-            normalized_folder = folder_path.strip("/")
-            normalized_file = file_path.strip("/")
-            
-            # Check if the file is in this folder or its subdirectories
-            if normalized_file.startswith(normalized_folder + "/") or normalized_file.startswith(normalized_folder):
-                # Use the most specific (longest) matching folder path
-                if len(normalized_folder) > len(longest_match):
-                    threshold = folder_threshold
-                    longest_match = normalized_folder
-        
+        normalized_file = file_path.strip("/")
+
+        threshold = self._threshold_cache.get(normalized_file)
+        if threshold is None:
+            threshold = self._resolve_threshold(normalized_file)
+            self._threshold_cache[normalized_file] = threshold
         return threshold
+
+    def _resolve_threshold(self, normalized_file: str) -> float:
+        """
+        Find the threshold of the most specific folder containing a file.
+
+        Args:
+            normalized_file: File path with leading/trailing slashes stripped
+
+        Returns:
+            Threshold of the longest matching folder prefix, or the global threshold
+        """
+        for normalized_folder, folder_threshold in self._sorted_folders:
+            # Check if the file is in this folder or its subdirectories
+            if normalized_file.startswith(normalized_folder):
+                return folder_threshold
+        return self.global_threshold
     
     def get_configuration_summary(self) -> Dict[str, Any]:
         """Get configuration summary for reporting."""
@@ -114,15 +118,22 @@ class ThresholdConfig:
     
     def print_configuration(self) -> None:
         """Print threshold configuration to console."""
-        self.console.print("\n[bold blue]📊 Threshold Configuration[/bold blue]")
-        self.console.print(f"  Global Threshold: [green]{self.global_threshold}[/green]")
-        
+        self.console.print("\n".join(self.get_configuration_lines()))
+
+    def get_configuration_lines(self) -> List[str]:
+        """Get the threshold configuration as Rich markup lines to print in one call."""
+        lines = [
+            "\n[bold blue]📊 Threshold Configuration[/bold blue]",
+            f"  Global Threshold: [green]{self.global_threshold}[/green]",
+        ]
+
         if self.folder_thresholds:
-            self.console.print("  Folder-Specific Thresholds:")
+            lines.append("  Folder-Specific Thresholds:")
             for folder, threshold in self.folder_thresholds.items():
-                self.console.print(f"    {folder}: [green]{threshold}[/green]")
+                lines.append(f"    {folder}: [green]{threshold}[/green]")
         else:
-            self.console.print("  No folder-specific thresholds configured")
+            lines.append("  No folder-specific thresholds configured")
+        return lines
     
     @classmethod
     def from_strings(
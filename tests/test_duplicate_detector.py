@@ -1,11 +1,34 @@
+import ast
+import io
+import pickle
+import random
 import pytest
 import tempfile
 import os
+import subprocess
 from pathlib import Path
 
-from scripts.duplicate_detector.models import CodeFunction, DuplicateMatch
-from scripts.duplicate_detector.detector import DuplicateLogicDetector  
-from scripts.duplicate_detector.similarity import SimilarityAnalyzer
+from rich.console import Console
+
+from scripts.duplicate_detector.cache import AnalysisCache
+from scripts.duplicate_detector.reporters import MultiFormatReporter
+from scripts.duplicate_detector.models import (
+    CodeFunction,
+    DuplicateMatch,
+    FunctionTable,
+    MatchSet,
+)
+from scripts.duplicate_detector.detector import (
+    DuplicateLogicDetector,
+    GitChangeAnalyzer,
+)
+from scripts.duplicate_detector.extractor import PythonFunctionExtractor
+from scripts.duplicate_detector import similarity as similarity_module
+from scripts.duplicate_detector.similarity import (
+    LevenshteinNormSimilarity,
+    SimilarityAnalyzer,
+    SimilarityCalculator,
+)
 from scripts.duplicate_detector.thresholds import ThresholdConfig, create_threshold_config_from_env
 
 
@@ -30,6 +53,62 @@ class TestCodeFunction:
         assert func.signature == "def test_function(x, y):"
         assert func.body_content == "def test_function(x, y):\n    return x + y"
 
+    def test_released_body_is_reloaded_from_file(self, tmp_path):
+        """Test that body_content is re-read from disk after release_body()."""
+        source = tmp_path / "module.py"
+        source.write_text(
+            "import os\n\ndef add(x, y):\n    return x + y\n\nVALUE = 1\n"
+        )
+
+        func = CodeFunction(
+            name="add",
+            file_path=str(source),
+            line_start=3,
+            line_end=4,
+            signature="def add(x, y)",
+            body_content="def add(x, y):\n    return x + y"
+        )
+        func.release_body()
+
+        assert func.body_content == "def add(x, y):\n    return x + y"
+
+        # Reloading splits CRLF files into the same lines as extraction
+        source.write_bytes(source.read_bytes().replace(b"\n", b"\r\n"))
+        assert func.body_content == "def add(x, y):\n    return x + y"
+
+    def test_equality_compares_body_content(self):
+        """Test that functions differing only in their body are not equal."""
+        func = CodeFunction("f", "x.py", 1, 2, "def f()", "return 1")
+
+        assert func == CodeFunction("f", "x.py", 1, 2, "def f()", "return 1")
+        assert func != CodeFunction("f", "x.py", 1, 2, "def f()", "return 2")
+
+    def test_slotted_function_survives_pickling(self):
+        """Test that slotted functions carry no __dict__ and pickle with their body."""
+        func = CodeFunction("add", "test.py", 1, 2, "def add(x, y)", "return x + y")
+
+        restored = pickle.loads(pickle.dumps(func))
+
+        assert not hasattr(func, "__dict__")
+        assert restored == func
+        assert restored.body_content == "return x + y"
+
+    def test_function_table_columns(self):
+        """Test that FunctionTable rows line up with the source functions."""
+        funcs = [
+            CodeFunction("a", "one.py", 1, 5, "def a()", "def a(): pass"),
+            CodeFunction("b", "two.py", 7, 9, "def b()", "def b(): pass"),
+        ]
+
+        table = FunctionTable.from_functions(funcs)
+
+        assert len(table) == 2
+        assert table.names == ["a", "b"]
+        assert table.paths == ["one.py", "two.py"]
+        assert table.line_starts == [1, 7]
+        assert table.line_ends == [5, 9]
+        assert table.functions[1] is funcs[1]
+
 
 class TestDuplicateMatch:
     """Test the DuplicateMatch dataclass."""
@@ -55,6 +134,51 @@ class TestDuplicateMatch:
         assert match.new_function == func1
         assert match.existing_function == func2
 
+    @pytest.mark.parametrize(
+        "score, level",
+        [(0.0, "Very Low"), (0.39, "Very Low"), (0.4, "Low"), (0.6, "Medium"),
+         (0.79, "Medium"), (0.8, "High"), (1.0, "High")],
+    )
+    def test_confidence_level_boundaries(self, score, level):
+        """Test that confidence levels switch exactly at their lower bounds."""
+        func = CodeFunction(
+            name="func1", file_path="file1.py", line_start=1, line_end=5,
+            signature="def func1():", body_content="def func1():\n    pass"
+        )
+
+        assert DuplicateMatch(func, func, score).confidence_level == level
+
+    def test_match_set_partitions_sorted_matches(self):
+        """Test that MatchSet sorts matches and splits off high confidence ones."""
+        func = CodeFunction(
+            name="func1", file_path="file1.py", line_start=1, line_end=5,
+            signature="def func1():", body_content="def func1():\n    pass"
+        )
+        matches = [DuplicateMatch(func, func, score) for score in (0.5, 0.9, 0.8, 0.3)]
+
+        match_set = MatchSet.from_matches(matches)
+
+        assert [m.similarity_score for m in match_set] == [0.9, 0.8, 0.5, 0.3]
+        assert [m.similarity_score for m in match_set.high_confidence] == [0.9, 0.8]
+        assert [m.similarity_score for m in match_set.other] == [0.5, 0.3]
+        assert MatchSet.from_matches(match_set) is match_set
+
+    def test_constructors_validate_input(self):
+        """Test that DuplicateMatch and CodeFunction reject invalid arguments."""
+        func = CodeFunction(
+            name="func1", file_path="file1.py", line_start=1, line_end=5,
+            signature="def func1():", body_content="def func1():\n    pass"
+        )
+
+        with pytest.raises(ValueError):
+            DuplicateMatch(func, func, 1.5)
+        with pytest.raises(TypeError):
+            DuplicateMatch("func1", func, 0.5)
+        with pytest.raises(ValueError):
+            CodeFunction("", "file1.py", 1, 5, "def func1():")
+        with pytest.raises(ValueError):
+            CodeFunction("func1", "file1.py", 5, 1, "def func1():")
+
 
 class TestDuplicateLogicDetector:
     """Test the main duplicate logic detector class."""
@@ -139,6 +263,31 @@ class TestClass:
         assert len(functions) >= 1
         function_names = [f.name for f in functions]
         assert "simple_function" in function_names
+
+    def test_extract_normalizes_line_endings(self, detector, temp_repo):
+        """Test that CRLF and CR files give the same bodies as LF files."""
+        source = "def f(x):\n    y = x + 1\n    return y\n"
+        for newline in ("\r\n", "\r"):
+            test_file = temp_repo / "line_endings.py"
+            test_file.write_bytes(source.replace("\n", newline).encode("utf-8"))
+
+            functions = detector.extractor.extract_from_file(test_file)
+
+            assert [(f.line_start, f.line_end) for f in functions] == [(1, 3)]
+            assert functions[0].body_content == (
+                "def f(x):\n    y = x + 1\n    return y"
+            )
+
+    def test_extract_mapped_file_line_endings(self, detector, temp_repo):
+        """Test that memory-mapped files get LF line endings too."""
+        padding = "# padding\n" * 2000
+        source = padding + "def f(x):\n    return x\n"
+        test_file = temp_repo / "large.py"
+        test_file.write_bytes(source.replace("\n", "\r\n").encode("utf-8"))
+
+        functions = detector.extractor.extract_from_file(test_file)
+
+        assert [f.body_content for f in functions] == ["def f(x):\n    return x"]
     
     def test_calculate_similarity(self, detector):
         """Test similarity calculation between two functions."""
@@ -185,6 +334,375 @@ class TestClass:
         assert isinstance(similarity, float)
         assert 0 <= similarity <= 1
 
+    def test_extraction_order_matches_ast_walk(self, detector):
+        """Test that functions are found in ast.walk order, including nested blocks."""
+        source = """
+def outer():
+    def inner():
+        pass
+    return [lambda: 1]
+
+class Box:
+    async def method(self):
+        try:
+            pass
+        except ValueError:
+            def handler():
+                pass
+
+match value:
+    case 1:
+        def in_case():
+            pass
+
+with ctx:
+    def in_with():
+        pass
+"""
+        functions = detector.extractor.extract_from_content(source, "order.py")
+
+        expected = [
+            node.name
+            for node in ast.walk(ast.parse(source))
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
+        assert [f.name for f in functions] == expected
+        assert len(expected) == 6
+
+
+class TestGitChangeAnalyzer:
+    """Test cases for GitChangeAnalyzer."""
+
+    def test_get_file_statuses_parses_one_diff(self, tmp_path):
+        """Test that added, modified, deleted and renamed files are classified."""
+        def git(*args):
+            subprocess.run(
+                ["git", *args], cwd=tmp_path, check=True, capture_output=True
+            )
+
+        def commit():
+            git("add", "-A")
+            git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "c")
+
+        git("init", "-q")
+        (tmp_path / "keep.py").write_text("a = 1\n")
+        (tmp_path / "gone.py").write_text("b = 2\n")
+        (tmp_path / "old name.py").write_text("def f():\n    return 'unchanged body'\n")
+        commit()
+        (tmp_path / "keep.py").write_text("a = 3\n")
+        (tmp_path / "gone.py").unlink()
+        (tmp_path / "old name.py").rename(tmp_path / "new name.py")
+        (tmp_path / "added.py").write_text("c = 4\n")
+        commit()
+
+        analyzer = GitChangeAnalyzer(tmp_path, console=Console(file=io.StringIO()))
+        assert analyzer.get_file_statuses("HEAD~1", "HEAD") == {
+            "added.py": "A",
+            "gone.py": "D",
+            "keep.py": "M",
+            "new name.py": "R",
+        }
+        assert analyzer.get_file_statuses("HEAD~1", "no-such-ref") == {}
+
+
+class TestSimilarityAnalyzer:
+    """Test the SimilarityAnalyzer batch APIs."""
+
+    @pytest.fixture
+    def functions(self):
+        """Create a few small functions to compare."""
+        bodies = [
+            "def a(x):\n    return x + 1",
+            "def b(y):\n    return y + 1",
+            "def c(items):\n    return [i for i in items if i]",
+        ]
+        return [
+            CodeFunction(
+                name=f"f{i}", file_path=f"file{i}.py", line_start=1, line_end=2,
+                signature=f"def f{i}():", body_content=body
+            )
+            for i, body in enumerate(bodies)
+        ]
+
+    @pytest.mark.parametrize(
+        "method", ["jaccard_tokens", "sequence_matcher", "levenshtein_norm"]
+    )
+    def test_calculate_matrix_matches_pairwise(self, functions, method):
+        """Test that the batched matrix agrees with pairwise scoring."""
+        analyzer = SimilarityAnalyzer(method)
+
+        matrix = analyzer.calculate_matrix(functions, functions)
+        rectangular = analyzer.calculate_matrix(functions[:1], functions[1:])
+
+        for i, func_a in enumerate(functions):
+            for j, func_b in enumerate(functions):
+                expected = analyzer.calculate_similarity(func_a, func_b)
+                assert matrix[i][j] == pytest.approx(expected)
+        assert rectangular[0] == pytest.approx(matrix[0][1:])
+
+    @pytest.mark.parametrize(
+        "method", ["jaccard_tokens", "sequence_matcher", "levenshtein_norm"]
+    )
+    def test_calculate_pairs_keeps_cells_above_min_score(self, functions, method):
+        """Test that calculate_pairs returns exactly the matrix cells above 0.5."""
+        analyzer = SimilarityAnalyzer(method)
+        matrix = analyzer.calculate_matrix(functions, functions[::-1])
+
+        pairs = analyzer.calculate_pairs(functions, functions[::-1], min_score=0.5)
+
+        expected = [
+            (i, j)
+            for i, row in enumerate(matrix)
+            for j, score in enumerate(row)
+            if score >= 0.5
+        ]
+        assert [(i, j) for i, j, _ in pairs] == expected
+        for i, j, score in pairs:
+            assert score == pytest.approx(matrix[i][j])
+
+    @pytest.mark.parametrize("min_score", [0.2, 0.5, 0.9])
+    def test_jaccard_prefix_filter_matches_full_scan(self, monkeypatch, min_score):
+        """Test that the scipy-free prefix filter matches the full scan exactly."""
+        rng = random.Random(7)
+        words = [f"w{i}" for i in range(40)]
+        functions = [
+            CodeFunction(
+                name=f"f{i}", file_path="file.py", line_start=1, line_end=2,
+                signature="",
+                body_content=" ".join(
+                    rng.choice(words[:rng.randint(1, 40)])
+                    for _ in range(rng.randint(0, 12))
+                ),
+            )
+            for i in range(60)
+        ]
+        calculator = similarity_module.JaccardTokensSimilarity()
+        monkeypatch.setattr(similarity_module, "_csr_matrix", None)
+
+        pairs = calculator.calculate_pairs(
+            functions[:20], functions, min_score=min_score
+        )
+        expected = SimilarityCalculator.calculate_pairs(
+            calculator, functions[:20], functions, min_score=min_score
+        )
+
+        assert [(i, j) for i, j, _ in pairs] == [(i, j) for i, j, _ in expected]
+        assert [score for _, _, score in pairs] == pytest.approx(
+            [score for _, _, score in expected]
+        )
+
+    def test_find_candidate_pairs_uses_shared_ngrams(self, functions):
+        """Test that only functions sharing token 3-grams become candidates."""
+        # An exact copy of f0 shares all of its 3-grams; f2 shares almost none
+        copy = CodeFunction(
+            name="copy", file_path="copy.py", line_start=1, line_end=2,
+            signature="def copy():", body_content="def a(x):\n    return x + 1"
+        )
+
+        within = SimilarityAnalyzer.find_candidate_pairs(
+            functions + [copy], min_shared=3
+        )
+        across = SimilarityAnalyzer.find_candidate_pairs(
+            [copy], functions, min_shared=3
+        )
+
+        assert (0, 3) in within
+        assert all(i < j for i, j in within)
+        assert (0, 0) in across
+        assert (0, 2) not in across
+
+    def test_find_lsh_candidate_pairs_finds_copies(self, functions, monkeypatch):
+        """Test that identical functions always share an LSH band, numpy or not."""
+        copy = CodeFunction(
+            name="copy", file_path="copy.py", line_start=1, line_end=2,
+            signature="def copy():", body_content="def a(x):\n    return x + 1"
+        )
+
+        within = SimilarityAnalyzer.find_lsh_candidate_pairs(functions + [copy])
+        across = SimilarityAnalyzer.find_lsh_candidate_pairs(
+            [copy], functions, threshold=0.9
+        )
+
+        assert (0, 3) in within
+        assert all(i < j for i, j in within)
+        assert (0, 0) in across
+
+        monkeypatch.setattr(similarity_module, "_np", None)
+        assert SimilarityAnalyzer.find_lsh_candidate_pairs(functions + [copy]) == within
+
+    def test_levenshtein_python_cutoff(self):
+        """Test that the early-exit Python kernel is exact above the cutoff."""
+        rng = random.Random(0)
+        for _ in range(200):
+            a = "".join(rng.choice("ab c") for _ in range(rng.randint(1, 30)))
+            b = "".join(rng.choice("ab c") for _ in range(rng.randint(1, 30)))
+            min_score = rng.choice([0.3, 0.5, 0.7, 0.9])
+
+            exact = LevenshteinNormSimilarity._calculate_python(a, b)
+            bounded = LevenshteinNormSimilarity._calculate_python(a, b, min_score)
+
+            if exact >= min_score:
+                assert bounded == exact
+            else:
+                assert exact <= bounded < min_score
+
+    def test_parallel_matrix_matches_serial(self, functions):
+        """Test that scoring rows in worker processes gives the serial result."""
+        calculator = SimilarityAnalyzer("sequence_matcher")._calculator
+
+        serial = calculator.calculate_matrix(functions, functions[::-1])
+        parallel = SimilarityCalculator.calculate_matrix(
+            calculator, functions, functions[::-1], n_jobs=2
+        )
+
+        assert parallel == serial
+
+    def test_parallel_bounded_sequence_matcher_matches_serial(self, functions):
+        """Test that matching surviving pairs in worker processes is exact."""
+        calculator = SimilarityAnalyzer("sequence_matcher")._calculator
+
+        serial = calculator.calculate_matrix(functions, functions[::-1], 0.3)
+        parallel = calculator.calculate_matrix(
+            functions, functions[::-1], 0.3, n_jobs=2
+        )
+
+        assert parallel == serial
+
+    @pytest.mark.parametrize(
+        "method", ["jaccard_tokens", "sequence_matcher", "levenshtein_norm"]
+    )
+    def test_upper_bound_never_below_score(self, functions, method):
+        """Test that each method's cheap bound is a true upper bound."""
+        calculator = SimilarityAnalyzer(method)._calculator
+
+        for func_a in functions:
+            for func_b in functions:
+                bound = calculator.upper_bound(func_a, func_b)
+                assert bound >= calculator.calculate(func_a, func_b)
+
+    def test_min_score_returns_bound_for_hopeless_pairs(self, functions):
+        """Test that calculate_similarity short-circuits below min_score."""
+        analyzer = SimilarityAnalyzer("levenshtein_norm")
+        short, long_ = functions[0], functions[2]
+
+        bound = analyzer.calculate_similarity(short, long_, min_score=0.99)
+
+        assert bound < 0.99
+        assert bound >= analyzer.calculate_similarity(short, long_)
+
+    def test_jaccard_tokens_match_across_ascii_and_unicode_bodies(self):
+        """Test that ASCII and non-ASCII bodies produce comparable tokens."""
+        ascii_func = CodeFunction(
+            name="greet", file_path="a.py", line_start=1, line_end=2,
+            signature="def greet():",
+            body_content="def greet(name):\n    return name + 1",
+        )
+        unicode_func = CodeFunction(
+            name="greet", file_path="b.py", line_start=1, line_end=2,
+            signature="def greet():",
+            body_content="def greet(name):  # héllo\n    return name + 1",
+        )
+        analyzer = SimilarityAnalyzer("jaccard_tokens")
+
+        assert analyzer.calculate_similarity(ascii_func, unicode_func) < 1.0
+        assert "greet" in unicode_func._tokens and "héllo" in unicode_func._tokens
+        assert unicode_func._tokens - {"héllo"} == ascii_func._tokens
+
+    def test_top_k_matches_matches_stable_sort(self, functions):
+        """Test that top_k_matches keeps the same pairs as a full stable sort."""
+        scores = [0.5, 0.9, 0.5, 0.2, 0.9, 0.7]
+        pairs = [
+            (functions[i % 3], functions[(i + 1) % 3], score)
+            for i, score in enumerate(scores)
+        ]
+
+        top = SimilarityAnalyzer.top_k_matches(pairs, k=4, threshold=0.3)
+        expected = sorted(
+            (pair for pair in pairs if pair[2] >= 0.3), key=lambda p: p[2], reverse=True
+        )[:4]
+
+        assert [
+            (m.new_function, m.existing_function, m.similarity_score) for m in top
+        ] == expected
+        assert SimilarityAnalyzer.top_k_matches(pairs, k=0) == []
+
+
+class TestAnalysisCache:
+    """Test the persistent AnalysisCache."""
+
+    def test_round_trip_and_pruning(self, tmp_path):
+        """Test that used entries survive a save and unused ones are dropped."""
+        key_a = AnalysisCache.content_key("def a(): pass")
+        key_b = AnalysisCache.content_key("def b(): pass")
+
+        cache = AnalysisCache(tmp_path)
+        cache.put("tokens", key_a, frozenset({"a"}))
+        cache.put("tokens", key_b, frozenset({"b"}))
+        cache.save()
+
+        warm = AnalysisCache(tmp_path)
+        assert warm.get("tokens", key_a) == frozenset({"a"})
+        warm.put("tokens", AnalysisCache.content_key("def c(): pass"), frozenset({"c"}))
+        warm.save()
+
+        assert AnalysisCache(tmp_path).get("tokens", key_b) is None
+        assert AnalysisCache(tmp_path).get("tokens", key_a) == frozenset({"a"})
+
+    def test_corrupt_cache_is_ignored(self, tmp_path):
+        """Test that an unreadable cache file behaves like an empty cache."""
+        (tmp_path / "tokens.pkl").write_bytes(b"not a pickle")
+        cache = AnalysisCache(tmp_path, console=Console(file=io.StringIO()))
+
+        assert cache.get("tokens", AnalysisCache.content_key("x")) is None
+
+    def test_warm_jaccard_run_matches_cold_run(self, tmp_path):
+        """Test that cached token sets give the same scores as fresh ones."""
+        bodies = ["def a(x):\n    return x + 1", "def b(y):\n    return y * 2 + 1"]
+
+        def make_functions():
+            return [
+                CodeFunction(f"f{i}", f"f{i}.py", 1, 2, "def f():", body)
+                for i, body in enumerate(bodies)
+            ]
+
+        cold = SimilarityAnalyzer("jaccard_tokens", cache=AnalysisCache(tmp_path))
+        cold_funcs = make_functions()
+        cold.prepare(cold_funcs)
+        cold._calculator.cache.save()
+
+        warm = SimilarityAnalyzer("jaccard_tokens", cache=AnalysisCache(tmp_path))
+        warm_funcs = make_functions()
+        warm.prepare(warm_funcs)
+
+        assert [f._tokens for f in warm_funcs] == [f._tokens for f in cold_funcs]
+        assert warm.calculate_matrix(warm_funcs, warm_funcs) == cold.calculate_matrix(
+            cold_funcs, cold_funcs
+        )
+
+    def test_warm_extraction_skips_parsing(self, tmp_path, monkeypatch):
+        """Test that functions of unchanged files are rebuilt from the cache."""
+        source = tmp_path / "module.py"
+        source.write_text(
+            "def f(x: int) -> int:\n    return x\n\n\nasync def g():\n    pass\n"
+        )
+        cache_dir = tmp_path / "cache"
+
+        cold_cache = AnalysisCache(cache_dir)
+        cold = PythonFunctionExtractor(cache=cold_cache).extract_from_file(source)
+        cold_cache.save()
+
+        warm_extractor = PythonFunctionExtractor(cache=AnalysisCache(cache_dir))
+        monkeypatch.setattr(warm_extractor, "extract_from_content", None)
+        warm = warm_extractor.extract_from_file(source)
+
+        def fields(functions):
+            return [
+                (f.name, f.signature, f.line_start, f.line_end, f.body_content)
+                for f in functions
+            ]
+
+        assert fields(warm) == fields(cold)
+
 
 class TestIntegration:
     """Integration tests for the complete duplicate detection process."""
@@ -246,6 +764,205 @@ def compute_discount_amount(original_price, discount_percent):
             assert match.similarity_score >= 0.0
             assert match.similarity_score <= 1.0
     
+    def test_max_matches_keeps_highest_scores(self, sample_repo):
+        """Test that max_matches returns the top of the full result list."""
+        threshold_config = ThresholdConfig(global_threshold=0.1)
+        detector = DuplicateLogicDetector(
+            repository_path=str(sample_repo),
+            min_function_lines=1,
+            threshold_config=threshold_config,
+        )
+        changed_files = [str(sample_repo / "duplicates.py")]
+
+        all_matches = detector.analyze_pr_changes(changed_files, "base_sha", "head_sha")
+        top_matches = detector.analyze_pr_changes(
+            changed_files, "base_sha", "head_sha", max_matches=2
+        )
+
+        assert len(all_matches) > 2
+        assert [m.similarity_score for m in top_matches] == [
+            m.similarity_score for m in all_matches[:2]
+        ]
+
+    def test_progress_is_not_logged_off_terminal(self, sample_repo):
+        """Test that captured output gets the messages but no spinner snapshot."""
+        output = io.StringIO()
+        detector = DuplicateLogicDetector(
+            repository_path=str(sample_repo), console=Console(file=output)
+        )
+
+        detector.analyze_pr_changes(
+            [str(sample_repo / "duplicates.py")], "base_sha", "head_sha"
+        )
+
+        assert "Analysis complete" in output.getvalue()
+        assert "Indexing existing codebase" not in output.getvalue()
+
+    def test_changed_files_reuse_indexed_functions(self, sample_repo, monkeypatch):
+        """Test that changed files already in the index are not parsed again."""
+        detector = DuplicateLogicDetector(
+            repository_path=str(sample_repo), min_function_lines=1
+        )
+        changed_file = str(sample_repo / "duplicates.py")
+        parsed = detector._get_changed_functions(changed_file, "base_sha", "head_sha")
+
+        detector._index_existing_functions()
+        monkeypatch.setattr(
+            detector.extractor, "extract_from_file",
+            lambda path: pytest.fail(f"{path} parsed again"),
+        )
+        reused = detector._get_changed_functions(changed_file, "base_sha", "head_sha")
+
+        assert [(f.name, f.line_start, f.body_content) for f in reused] == [
+            (f.name, f.line_start, f.body_content) for f in parsed
+        ]
+
+    def test_parallel_indexing_matches_serial(self, sample_repo, monkeypatch):
+        """Test that indexing in worker processes finds the same functions in order."""
+        def index(n_jobs, cache_dir=None):
+            detector = DuplicateLogicDetector(
+                repository_path=str(sample_repo),
+                min_function_lines=1,
+                n_jobs=n_jobs,
+                cache_dir=cache_dir,
+            )
+            detector._index_existing_functions()
+            return [
+                (f.file_path, f.name, f.line_start, f.body_content)
+                for f in detector.existing_functions
+            ]
+
+        serial = index(None)
+        assert serial
+        assert index(2) == serial
+
+        # Cold run fills the cache from the workers, warm run reads it back
+        cache_dir = sample_repo / ".cache"
+        assert index(2, cache_dir) == serial
+        monkeypatch.setattr(
+            PythonFunctionExtractor, "extract_from_content",
+            lambda self, content, path: pytest.fail(f"{path} parsed again"),
+        )
+        assert index(2, cache_dir) == serial
+
+    def test_git_repository_files_respect_gitignore(self, tmp_path):
+        """Test that the corpus comes from git, including untracked unignored files."""
+        def git(*args):
+            subprocess.run(
+                ["git", *args], cwd=tmp_path, check=True, capture_output=True
+            )
+
+        git("init", "-q")
+        (tmp_path / ".gitignore").write_text("venv/\n")
+        (tmp_path / "tracked.py").write_text("a = 1\n")
+        git("add", ".")
+        (tmp_path / "untracked.py").write_text("b = 2\n")
+        (tmp_path / "venv").mkdir()
+        (tmp_path / "venv" / "ignored.py").write_text("c = 3\n")
+
+        detector = DuplicateLogicDetector(repository_path=str(tmp_path))
+
+        assert sorted(p.name for p in detector._list_python_files()) == [
+            "tracked.py",
+            "untracked.py",
+        ]
+
+    def test_generate_reports_matches_single_reports(self, sample_repo):
+        """Test that generating several formats at once matches one at a time."""
+        detector = DuplicateLogicDetector(
+            repository_path=str(sample_repo),
+            min_function_lines=1,
+            threshold_config=ThresholdConfig(global_threshold=0.1),
+        )
+        matches = detector.analyze_pr_changes(
+            [str(sample_repo / "duplicates.py")], "base_sha", "head_sha"
+        )
+        reporter = MultiFormatReporter(Console(file=io.StringIO()))
+
+        reports = reporter.generate_reports(matches, ("github", "json"))
+
+        assert reports == {
+            "github": reporter.generate_report(matches, "github"),
+            "json": reporter.generate_report(matches, "json"),
+        }
+        assert reporter.generate_reports(matches, ("github", "json"), encoded=True) == {
+            name: report.encode("utf-8") for name, report in reports.items()
+        }
+
+    def test_candidate_filters_return_subset(self, sample_repo):
+        """Test that n-gram and LSH candidate filtering only drop matches."""
+        def run(**kwargs):
+            detector = DuplicateLogicDetector(
+                repository_path=str(sample_repo),
+                min_function_lines=1,
+                threshold_config=ThresholdConfig(global_threshold=0.1),
+                **kwargs,
+            )
+            matches = detector.analyze_pr_changes(
+                [str(sample_repo / "duplicates.py")], "base_sha", "head_sha"
+            )
+            return {
+                (m.new_function.name, m.existing_function.name, m.similarity_score)
+                for m in matches
+            }
+
+        full = run()
+        filtered = run(min_shared_ngrams=3)
+        lsh_filtered = run(index="minhash_lsh")
+
+        assert filtered
+        assert filtered <= full
+        assert lsh_filtered
+        assert lsh_filtered <= full
+
+        with pytest.raises(ValueError):
+            run(index="unknown")
+
+    def test_lsh_index_finds_copies_among_many_functions(self, tmp_path):
+        """Test that the LSH index keeps every copied function on a larger codebase."""
+        template = (
+            "def {name}(items, limit):\n"
+            "    total = {a}\n"
+            "    for item in items:\n"
+            "        if item {op} limit:\n"
+            "            total += item * {b}\n"
+            "    return total - {c}\n"
+        )
+        operators = ["<", ">", "<=", ">=", "==", "!="]
+        bodies = [
+            dict(a=i, op=operators[i % 6], b=i % 7 + 1, c=i * 3) for i in range(200)
+        ]
+        (tmp_path / "library.py").write_text(
+            "\n\n".join(
+                template.format(name=f"func_{i}", **b) for i, b in enumerate(bodies)
+            )
+        )
+        copied = [3, 50, 121, 199]
+        (tmp_path / "new_code.py").write_text(
+            "\n\n".join(template.format(name=f"copy_{i}", **bodies[i]) for i in copied)
+        )
+
+        def run(index):
+            detector = DuplicateLogicDetector(
+                repository_path=str(tmp_path),
+                threshold_config=ThresholdConfig(global_threshold=0.8),
+                index=index,
+            )
+            matches = detector.analyze_pr_changes(
+                [str(tmp_path / "new_code.py")], "base_sha", "head_sha"
+            )
+            return {
+                (m.new_function.name, m.existing_function.name, m.similarity_score)
+                for m in matches
+            }
+
+        full = run("exhaustive")
+        lsh_filtered = run("minhash_lsh")
+
+        assert lsh_filtered <= full
+        found = {(new, existing) for new, existing, _ in lsh_filtered}
+        assert all((f"copy_{i}", f"func_{i}") in found for i in copied)
+
     def test_detector_with_custom_thresholds(self, sample_repo):
         """Test detector with custom threshold configuration."""
         folder_thresholds = {"src/shared": 0.1, "src/tests": 0.9}
@@ -312,6 +1029,13 @@ def compute_discount_amount(original_price, discount_percent):
         # For match 2: test-duplicate.py (0.3) vs src/projects/integrations/... (0.4) -> max = 0.4  
         # Similarity 30.9% (0.309) < 0.4 -> should NOT report
 
+    def test_package_exports_main_function(self):
+        """Test that the package-level ``main`` stays the entry point function."""
+        import scripts.duplicate_detector.main  # noqa: F401
+        from scripts.duplicate_detector import main
+
+        assert callable(main)
+
 
 class TestThresholdConfig:
     """Test the ThresholdConfig class."""
@@ -366,6 +1090,16 @@ class TestThresholdConfig:
         assert config.should_report_match(0.8, "src/main.py") == True  # 0.8 > 0.7 (global)
         assert config.should_report_match(0.6, "src/main.py") == False  # 0.6 < 0.7 (global)
     
+    def test_most_specific_folder_threshold_wins(self):
+        """Test that the longest matching folder prefix takes precedence."""
+        folder_thresholds = {"/src/": 0.2, "src/shared/core": 0.9, "src/shared": 0.4}
+        config = ThresholdConfig(folder_thresholds=folder_thresholds)
+
+        assert config.get_threshold_for_file("src/shared/core/io.py") == 0.9
+        assert config.get_threshold_for_file("/src/shared/utils.py") == 0.4
+        assert config.get_threshold_for_file("src/main.py") == 0.2
+        assert config.get_threshold_for_file("lib/main.py") == 0.7
+
     def test_get_configuration_summary(self):
         """Test getting configuration summary."""
         folder_thresholds = {"src/shared": 0.1, "src/tests": 0.9}